@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark the bulk parse/bump/serialize API against one call per version.
+
+Run from the repository root with ``python -m benchmarks.bench_bulk [COUNT]``
+(default: 1000000 version strings).
+"""
+
+from __future__ import print_function
+
+import sys
+import time
+
+from bumpversion import VersionConfig
+from bumpversion.version_part import ConfiguredVersionPartConfiguration
+
+
+def make_config():
+    return VersionConfig(
+        parse=r'(?P<major>\d+)\.(?P<minor>\d+)\.(?P<patch>\d+)(\-(?P<release>[a-z]+))?',
+        serialize=['{major}.{minor}.{patch}-{release}', '{major}.{minor}.{patch}'],
+        search='{current_version}',
+        replace='{new_version}',
+        part_configs={'release': ConfiguredVersionPartConfiguration(['dev', 'gamma'], optional_value='gamma')},
+    )
+
+
+def one_by_one(vc, version_strings):
+    order = vc.order()
+    return [vc.serialize(vc.parse(s).bump('patch', order), {}) for s in version_strings]
+
+
+def bulk(vc, version_strings):
+    return list(vc.serialize_many(vc.bump_many(vc.parse_many(version_strings), 'patch')))
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10 ** 6
+    version_strings = ['{}.{}.{}{}'.format(i % 7, i % 13, i % 101, '-dev' if i % 2 else '')
+                       for i in range(count)]
+    vc = make_config()
+
+    results = {}
+    for name, function in (('one by one', one_by_one), ('bulk', bulk)):
+        start = time.perf_counter()
+        results[name] = function(vc, version_strings)
+        elapsed = time.perf_counter() - start
+        print("{:>12}: {:>7.2f} s, {:>9.0f} versions/s".format(name, elapsed, count / elapsed))
+
+    assert results['one by one'] == results['bulk']
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark the latency of a dry-run bump served by the daemon, against a cold
+`python -m bumpversion` process.
+
+Run from the repository root with ``python -m benchmarks.bench_daemon``.
+"""
+
+from __future__ import print_function
+
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import timeit
+
+from bumpversion import daemon
+
+ROUNDS = 200
+COLD_ROUNDS = 10
+ARGS = ['--dry-run', 'patch']
+
+
+def _project():
+    directory = tempfile.mkdtemp()
+    with open(os.path.join(directory, '.bumpversion.cfg'), 'w') as f:
+        f.write("[bumpversion]\ncurrent_version = 1.2.3\n\n[bumpversion:file:VERSION]\n")
+    with open(os.path.join(directory, 'VERSION'), 'w') as f:
+        f.write("1.2.3\n")
+    return directory
+
+
+def main():
+    root = os.getcwd()
+    directory = _project()
+    socket_path = os.path.join(directory, 'bumpversion.sock')
+
+    server = daemon.make_server(socket_path)
+    thread = threading.Thread(target=server.serve_forever)
+    thread.start()
+    try:
+        seconds = min(timeit.repeat(lambda: daemon.request(ARGS, directory, socket_path),
+                                    number=ROUNDS, repeat=3))
+        print("{:<28}{:>7.2f} ms".format("daemon request:", seconds / ROUNDS * 1000))
+
+        env = dict(os.environ, PYTHONPATH=root, BUMPVERSION_SOCKET=socket_path,
+                   PYTHONPYCACHEPREFIX=os.path.join(directory, 'pycache'))
+        env.pop('PYTHONDONTWRITEBYTECODE', None)
+        for label, module in (("cold bumpversion-client:", 'bumpversion.daemon'),
+                              ("cold python -m bumpversion:", 'bumpversion')):
+            command = [sys.executable, '-m', module] + ARGS
+            seconds = min(timeit.repeat(lambda: subprocess.check_call(command, env=env, cwd=directory),
+                                        number=COLD_ROUNDS, repeat=3))
+            print("{:<28}{:>7.2f} ms".format(label, seconds / COLD_ROUNDS * 1000))
+    finally:
+        server.shutdown()
+        server.server_close()
+        thread.join()
+        shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    main()
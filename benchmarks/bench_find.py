@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark ConfiguredFile.find on growing version sources.
+
+Reports wall time and peak traced memory for a match at the top and at the
+bottom of the file. Run from the repository root with
+``python -m benchmarks.bench_find``.
+"""
+
+from __future__ import print_function
+
+import os
+import shutil
+import tempfile
+import time
+import tracemalloc
+
+from bumpversion import ConfiguredFile, VersionConfig
+
+FILLER = "# generated filler line that does not contain a version string\n"
+
+
+def make_source(directory, lines, match_at_top):
+    path = os.path.join(directory, 'setup.py')
+    with open(path, 'w') as f:
+        if match_at_top:
+            f.write("version='1.2.3'\n")
+        for _ in range(lines):
+            f.write(FILLER)
+        if not match_at_top:
+            f.write("version='1.2.3'\n")
+    return path
+
+
+def measure(path):
+    vc = VersionConfig(
+        parse=r'(?P<major>\d+)\.(?P<minor>\d+)\.(?P<patch>\d+)',
+        serialize=['{major}.{minor}.{patch}'],
+        search='{current_version}',
+        replace='{new_version}',
+    )
+    tracemalloc.start()
+    start = time.perf_counter()
+    version, _ = ConfiguredFile(path, vc).find()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    assert version is not None
+    return elapsed, peak
+
+
+def main():
+    directory = tempfile.mkdtemp()
+    try:
+        print("{:>10} {:>8} {:>12} {:>14}".format("lines", "match", "time (ms)", "peak (KiB)"))
+        for lines in (10 ** 3, 10 ** 4, 10 ** 5, 10 ** 6):
+            for match_at_top in (True, False):
+                path = make_source(directory, lines, match_at_top)
+                elapsed, peak = measure(path)
+                print("{:>10} {:>8} {:>12.2f} {:>14.1f}".format(
+                    lines, "top" if match_at_top else "bottom", elapsed * 1000, peak / 1024.0))
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    main()
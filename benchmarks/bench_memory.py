@@ -0,0 +1,40 @@
+# -*- coding: utf-8 -*-
+"""
+Measure the memory held per parsed Version.
+
+Run from the repository root with ``python -m benchmarks.bench_memory [COUNT]``
+(default: 100000 versions).
+"""
+
+from __future__ import print_function
+
+import sys
+import tracemalloc
+
+from bumpversion import VersionConfig
+from bumpversion.version_part import ConfiguredVersionPartConfiguration
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10 ** 5
+    vc = VersionConfig(
+        parse=r'(?P<major>\d+)\.(?P<minor>\d+)\.(?P<patch>\d+)(\-(?P<release>[a-z]+))?',
+        serialize=['{major}.{minor}.{patch}-{release}', '{major}.{minor}.{patch}'],
+        search='{current_version}',
+        replace='{new_version}',
+        part_configs={'release': ConfiguredVersionPartConfiguration(['dev', 'gamma'], optional_value='gamma')},
+    )
+    version_strings = ['{}.{}.{}-dev'.format(i % 7, i % 13, i) for i in range(count)]
+
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    versions = list(vc.parse_many(version_strings))
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    print("{} versions: {:.1f} bytes per version (excluding the version strings)".format(
+        len(versions), (after - before) / float(count)))
+
+
+if __name__ == '__main__':
+    main()
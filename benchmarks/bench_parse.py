@@ -0,0 +1,38 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark VersionConfig.parse() throughput with logging at the default level.
+
+Run from the repository root with ``python -m benchmarks.bench_parse``.
+"""
+
+from __future__ import print_function
+
+import logging
+import timeit
+
+from bumpversion import VersionConfig, logger
+
+ROUNDS = 50000
+
+PARSE = r'''
+    (?P<major>\d+)      # major version
+    \.(?P<minor>\d+)    # minor version
+    \.(?P<patch>\d+)    # patch level
+    (\-(?P<release>[a-z]+))?
+'''
+
+
+def main():
+    logger.setLevel(logging.WARNING)
+    vc = VersionConfig(
+        parse=PARSE,
+        serialize=['{major}.{minor}.{patch}-{release}', '{major}.{minor}.{patch}'],
+        search='{current_version}',
+        replace='{new_version}',
+    )
+    seconds = min(timeit.repeat(lambda: vc.parse('1.2.3-dev'), number=ROUNDS, repeat=3))
+    print("parse(): {:>10.0f} calls/s".format(ROUNDS / seconds))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,38 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark VersionConfig.serialize() throughput.
+
+Run from the repository root with ``python -m benchmarks.bench_serialize``.
+"""
+
+from __future__ import print_function
+
+import timeit
+
+from bumpversion import VersionConfig
+from bumpversion.version_part import ConfiguredVersionPartConfiguration
+
+ROUNDS = 20000
+
+
+def make_config():
+    return VersionConfig(
+        parse=r'(?P<major>\d+)\.(?P<minor>\d+)\.(?P<patch>\d+)(\-(?P<release>[a-z]+))?',
+        serialize=['{major}.{minor}.{patch}-{release}', '{major}.{minor}.{patch}'],
+        search='{current_version}',
+        replace='{new_version}',
+        part_configs={'release': ConfiguredVersionPartConfiguration(['dev', 'gamma'], optional_value='gamma')},
+    )
+
+
+def main():
+    vc = make_config()
+    context = {'$HOME': '/root', '$USER': 'root'}
+    for version_string in ('1.2.3', '1.2.3-dev'):
+        version = vc.parse(version_string)
+        seconds = min(timeit.repeat(lambda: vc.serialize(version, context), number=ROUNDS, repeat=3))
+        print("serialize({!r}): {:>10.0f} calls/s".format(version_string, ROUNDS / seconds))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark sorting parsed versions.
+
+Run from the repository root with ``python -m benchmarks.bench_sort [COUNT]``
+(default: 500000 versions).
+"""
+
+from __future__ import print_function
+
+import random
+import sys
+import time
+from bisect import bisect_left
+from operator import attrgetter
+
+from bumpversion import VersionConfig
+from bumpversion.version_part import ConfiguredVersionPartConfiguration
+
+
+def timed(name, function):
+    start = time.perf_counter()
+    result = function()
+    print("{:>32}: {:>7.3f} s".format(name, time.perf_counter() - start))
+    return result
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 500000
+    vc = VersionConfig(
+        parse=r'(?P<major>\d+)\.(?P<minor>\d+)\.(?P<patch>\d+)(\-(?P<release>[a-z]+))?',
+        serialize=['{major}.{minor}.{patch}-{release}', '{major}.{minor}.{patch}'],
+        search='{current_version}',
+        replace='{new_version}',
+        part_configs={'release': ConfiguredVersionPartConfiguration(['dev', 'gamma'], optional_value='gamma')},
+    )
+    rng = random.Random(0)
+    version_strings = ['{}.{}.{}{}'.format(rng.randint(0, 20), rng.randint(0, 50), rng.randint(0, 500),
+                                           rng.choice(['', '-dev'])) for _ in range(count)]
+    versions = timed("parse_many", lambda: list(vc.parse_many(version_strings)))
+    sort_key = attrgetter('sort_key')
+
+    timed("compute sort keys", lambda: [v.sort_key for v in versions])
+    by_key = timed("sorted(key=sort_key)", lambda: sorted(versions, key=sort_key))
+    by_operator = timed("sorted() via __lt__", lambda: sorted(versions))
+    timed("max(key=sort_key)", lambda: max(versions, key=sort_key))
+    keys = [v.sort_key for v in by_key]
+    timed("10000 x bisect on sort keys", lambda: [bisect_left(keys, v.sort_key) for v in versions[:10000]])
+
+    assert [v.sort_key for v in by_operator] == keys
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark the startup cost of a bumpversion invocation: a dry run of main()
+in-process, a cold `python -m bumpversion` and the command line pre-scan.
+
+Run from the repository root with ``python -m benchmarks.bench_startup``.
+"""
+
+from __future__ import print_function
+
+import logging
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import timeit
+
+from bumpversion import logger, logger_list, main as bumpversion_main, split_args_in_optional_and_positional
+
+ROUNDS = 200
+COLD_ROUNDS = 10
+ARGS = ['--dry-run', '--serialize', '{major}.{minor}.{patch}', 'patch']
+
+
+def _project():
+    directory = tempfile.mkdtemp()
+    with open(os.path.join(directory, '.bumpversion.cfg'), 'w') as f:
+        f.write("[bumpversion]\ncurrent_version = 1.2.3\n\n[bumpversion:file:VERSION]\n")
+    with open(os.path.join(directory, 'VERSION'), 'w') as f:
+        f.write("1.2.3\n")
+    return directory
+
+
+def main():
+    root = os.getcwd()
+    directory = _project()
+    os.chdir(directory)
+    try:
+        logger.setLevel(logging.WARNING)
+        logger_list.setLevel(logging.WARNING)
+        seconds = min(timeit.repeat(lambda: bumpversion_main(ARGS), number=ROUNDS, repeat=3))
+        print("main() dry run:       {:>8.2f} ms".format(seconds / ROUNDS * 1000))
+
+        env = dict(os.environ, PYTHONPATH=root)
+        command = [sys.executable, '-m', 'bumpversion'] + ARGS
+        seconds = min(timeit.repeat(lambda: subprocess.check_call(command, env=env),
+                                    number=COLD_ROUNDS, repeat=3))
+        print("python -m bumpversion: {:>7.2f} ms".format(seconds / COLD_ROUNDS * 1000))
+    finally:
+        os.chdir(root)
+        shutil.rmtree(directory)
+
+    long_args = ['--serialize', '{major}.{minor}.{patch}', 'patch'] + ['file{}'.format(i) for i in range(5000)]
+    seconds = min(timeit.repeat(lambda: split_args_in_optional_and_positional(long_args), number=10, repeat=3))
+    print("pre-scan of {} args: {:>7.2f} ms".format(len(long_args), seconds / 10 * 1000))
+
+
+if __name__ == '__main__':
+    main()
@@ -2,32 +2,30 @@
 
 from __future__ import unicode_literals
 
-try:
-    from configparser import RawConfigParser, NoOptionError
-except ImportError:
-    from ConfigParser import RawConfigParser, NoOptionError
+# Modules only some code paths need (argparse, configparser, difflib,
+# multiprocessing, tempfile, ...) are imported where they are used, to keep
+# `import bumpversion` and short runs fast.
 
-try:
-    from StringIO import StringIO
-except:
-    from io import StringIO
-
-import argparse
 import os
 import re
-import sre_constants
 import warnings
 import io
+import threading
+from collections import OrderedDict, deque, namedtuple
+from itertools import islice
 from string import Formatter
-from datetime import datetime
-from difflib import unified_diff
 
 import sys
-import codecs
 
-from bumpversion.version_part import VersionPart, NumericVersionPartConfiguration, ConfiguredVersionPartConfiguration
+from bumpversion.config import CONFIG_FILE, JOURNAL_DIRECTORY, DEFAULT_PARSE, DEFAULT_SERIALIZE, DEFAULT_SEARCH, \
+    DEFAULT_REPLACE, load_config, store_config
+from bumpversion.context import EnvironmentContext, GitContext, LayeredContext, TimeContext, format_map
+from bumpversion.functions import NumericFunction
+from bumpversion.version_part import VersionPart, NumericVersionPartConfiguration, ConfiguredVersionPartConfiguration, \
+    DEFAULT_PART_CONFIGURATION
 
 if sys.version_info[0] == 2:
+    import codecs
     sys.stdout = codecs.getwriter('utf-8')(sys.stdout)
 
 __VERSION__ = '0.5.4-dev'
@@ -42,56 +40,283 @@ import logging
 logger = logging.getLogger("bumpversion.logger")
 logger_list = logging.getLogger("bumpversion.list")
 
-from argparse import _AppendAction
+# names this module used to import eagerly, still available as attributes
+_LAZY_ATTRIBUTES = {
+    'RawConfigParser': ('configparser', 'ConfigParser'),
+    'NoOptionError': ('configparser', 'ConfigParser'),
+    'StringIO': ('io', 'StringIO'),
+    'DiscardDefaultIfSpecifiedAppendAction': ('bumpversion.arguments', 'bumpversion.arguments'),
+}
 
 
-class DiscardDefaultIfSpecifiedAppendAction(_AppendAction):
-    '''
-    Fixes bug http://bugs.python.org/issue16399 for 'append' action
-    '''
+def _import_lazy_attribute(name):
+    import importlib
+    module_name = _LAZY_ATTRIBUTES[name][0 if sys.version_info[0] > 2 else 1]
+    return getattr(importlib.import_module(module_name), name)
 
-    def __call__(self, parser, namespace, values, option_string=None):
-        if getattr(self, "_discarded_default", None) is None:
-            setattr(namespace, self.dest, [])
-            self._discarded_default = True
 
-        super(DiscardDefaultIfSpecifiedAppendAction, self).__call__(
-            parser, namespace, values, option_string=None)
+if sys.version_info >= (3, 7):
+    def __getattr__(name):
+        if name not in _LAZY_ATTRIBUTES:
+            raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
+        return _import_lazy_attribute(name)
+else:
+    for _name in _LAZY_ATTRIBUTES:
+        globals()[_name] = _import_lazy_attribute(_name)
 
 
-time_context = {
-    'now': datetime.now(),
-    'utcnow': datetime.utcnow(),
-}
+def _move_file_replace_existing(source, destination):
+    """
+    os.replace() for Python < 3.3 on Windows, where os.rename() fails if
+    destination exists: MoveFileExW() with MOVEFILE_REPLACE_EXISTING.
+    """
+    import ctypes
+
+    move_file_replace_existing = 0x1
+    encoding = sys.getfilesystemencoding()
+    source, destination = [
+        path.decode(encoding) if isinstance(path, bytes) else path for path in (source, destination)]
+    if not ctypes.windll.kernel32.MoveFileExW(source, destination, move_file_replace_existing):
+        raise ctypes.WinError()
+
+
+# os.replace() is Python 3.3+, os.rename() is atomic on POSIX as well
+if hasattr(os, 'replace'):
+    _replace_file = os.replace
+elif sys.platform == 'win32':
+    _replace_file = _move_file_replace_existing
+else:
+    _replace_file = os.rename
+
+# parameters of the rolling hash used to match multi-line search strings
+_HASH_BASE = 1000003
+_HASH_MODULUS = (1 << 61) - 1
 
 
 def prefixed_environ():
-    return dict((("${}".format(key), value) for key, value in os.environ.items()))
+    return EnvironmentContext()
+
+
+def iter_lines(path):
+    """
+    Lazily yield the lines of a UTF-8 file, without their trailing newline.
+
+    The file is read line by line, so callers that stop iterating early never
+    read (or decode) the rest of it.
+    """
+    with io.open(path, 'rb') as f:
+        for line in f:
+            yield line.decode('utf-8').rstrip("\n")
+
+
+def atomic_write(path, data, fsync=False):
+    """
+    Replace the content of path with data (bytes) atomically.
+
+    The data is written to a temporary file in the same directory, which is
+    then renamed over path, so readers never see a partially written file.
+    With fsync, the data and the rename are flushed to disk before returning.
+
+    A symlinked path has the file it points to replaced, and the new file
+    keeps the mode, and as far as permitted the owner and group, of the old.
+    """
+    import tempfile
+
+    path = os.path.realpath(path)
+    directory = os.path.dirname(path)
+    fd, tmp_path = tempfile.mkstemp(
+        prefix='.{}.'.format(os.path.basename(path)), suffix='.tmp', dir=directory)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+            if fsync:
+                f.flush()
+                os.fsync(f.fileno())
+        try:
+            stat = os.stat(path)
+        except OSError:
+            pass  # a new file
+        else:
+            if hasattr(os, 'chown'):
+                try:
+                    os.chown(tmp_path, stat.st_uid, stat.st_gid)
+                except OSError:
+                    pass  # only root can give files away
+            # after chown, which may clear the setuid and setgid bits
+            os.chmod(tmp_path, stat.st_mode & 0o7777)
+        _replace_file(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+    if fsync and hasattr(os, 'O_DIRECTORY'):
+        dir_fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+
+
+class ContentCache(object):
+    """
+    Per-run, write-through cache of decoded file contents.
+
+    Entries are keyed by path and validated against the file's size and mtime,
+    so every file is read and decoded at most once as long as it doesn't
+    change on disk (see iter_lines() for the exception). ``hits`` and
+    ``misses`` count the reads served from the cache and from disk.
+
+    Writes go through atomic_write() and are skipped if the file already has
+    the new content; ``files_written`` and ``bytes_written`` count the writes
+    that actually happened.
+    """
+
+    def __init__(self, fsync=False):
+        self._entries = {}
+        self._lock = threading.Lock()
+        self.fsync = fsync
+        self.hits = 0
+        self.misses = 0
+        self.files_written = 0
+        self.bytes_written = 0
+
+    @staticmethod
+    def _stat(path):
+        stat = os.stat(path)
+        return stat.st_size, getattr(stat, 'st_mtime_ns', stat.st_mtime)
+
+    def _lookup(self, path):
+        key = os.path.abspath(path)
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[0] != self._stat(path):
+            self._entries.pop(key, None)
+            return None
+        return entry[1]
+
+    def get(self, path):
+        """
+        Return the cached content of path, or None if it isn't cached (anymore).
+        """
+        content = self._lookup(path)
+        if content is not None:
+            with self._lock:
+                self.hits += 1
+        return content
+
+    def read(self, path):
+        content = self.get(path)
+        if content is not None:
+            return content
+
+        stat = self._stat(path)
+        with io.open(path, 'rb') as f:
+            content = f.read().decode('utf-8')
+        with self._lock:
+            self.misses += 1
+            self._entries[os.path.abspath(path)] = (stat, content)
+        return content
+
+    def store(self, path, content):
+        """
+        Record content as the current content of path, after it was written.
+        """
+        self._entries[os.path.abspath(path)] = (self._stat(path), content)
+
+    def write(self, path, content):
+        """
+        Atomically write content to path, unless the file already contains it.
+        :return: whether the file was written
+        """
+        if self._lookup(path) == content:
+            return False
+
+        data = content.encode('utf-8')
+        atomic_write(path, data, fsync=self.fsync)
+        with self._lock:
+            self.files_written += 1
+            self.bytes_written += len(data)
+        self.store(path, content)
+        return True
+
+    def iter_lines(self, path):
+        """
+        Like iter_lines(), but served from the cache if path is cached.
+
+        Uncached files are streamed, counting as a miss, and added to the
+        cache once the stream reaches the end of the file. A caller that stops
+        early avoids reading the rest of the file, but then the next read of
+        path reads it from disk again, as another miss: a file whose version
+        is found before its end (by ConfiguredFile.find()) is opened twice.
+        """
+        content = self.get(path)
+        if content is None:
+            return self._stream_lines(path)
+        return (line.rstrip("\n") for line in io.StringIO(content))
+
+    def _stream_lines(self, path):
+        stat = self._stat(path)
+        with self._lock:
+            self.misses += 1
+        lines = []
+        with io.open(path, 'rb') as f:
+            for line in f:
+                line = line.decode('utf-8')
+                lines.append(line)
+                yield line.rstrip("\n")
+        with self._lock:
+            self._entries[os.path.abspath(path)] = (stat, "".join(lines))
+
+
+class FileChange(namedtuple('FileChange', ['content_before', 'content_after', 'search', 'replacement'])):
+    """
+    The planned change of a file: its content before and after replacing
+    search with replacement.
+    """
+
+    @property
+    def changed(self):
+        return self.content_before != self.content_after
+
+
+class FilePatch(namedtuple('FilePatch', ['offsets', 'search', 'replacement'])):
+    """
+    The planned in-place change of an indexed file: overwriting search with
+    replacement, of the same length in bytes, at the byte offsets.
+    """
+
+    changed = True
 
 
 class ConfiguredFile(object):
-    def __init__(self, path, versionconfig):
+    def __init__(self, path, versionconfig, content_cache=None):
         self.path = path
         self._versionconfig = versionconfig
+        self._content_cache = content_cache if content_cache is not None else ContentCache()
 
     def find(self, part='patch'):
         """
         Attempt to find Version according to the pattern from version config file.
         :return: Version object, Version object with nulled patch or None, None if not found
         """
-        with io.open(self.path, 'rb') as f:
-            for line in f.readlines():
-                match = self._versionconfig.parse_regex.search(line.decode('utf-8').rstrip("\n"))
-                if match:
-                    _parsed = {}
-                    _parsed_zero_patch = {}
-                    for key, value in match.groupdict().items():
-                        if key == part:
-                            _parsed_zero_patch[key] = VersionPart('0', self._versionconfig.part_configs.get(key))
-                        else:
-                            _parsed_zero_patch[key] = VersionPart(value, self._versionconfig.part_configs.get(key))
-                        _parsed[key] = VersionPart(value, self._versionconfig.part_configs.get(key))
-                    return Version(_parsed, str(_parsed)), Version(_parsed_zero_patch, str(_parsed_zero_patch))
+        for line in self._content_cache.iter_lines(self.path):
+            match = self._versionconfig.parse_regex.search(line)
+            if match:
+                _parsed = {}
+                _parsed_zero_patch = {}
+                for key, value in match.groupdict().items():
+                    if key == part:
+                        _parsed_zero_patch[key] = VersionPart('0', self._versionconfig.part_configs.get(key))
+                    else:
+                        _parsed_zero_patch[key] = VersionPart(value, self._versionconfig.part_configs.get(key))
+                    _parsed[key] = VersionPart(value, self._versionconfig.part_configs.get(key))
+                order = self._versionconfig.order()
+                return (Version(_parsed, str(_parsed), order),
+                        Version(_parsed_zero_patch, str(_parsed_zero_patch), order))
         return None, None
 
     def should_contain_version(self, version, context):
@@ -104,7 +329,7 @@ class ConfiguredFile(object):
 
         context['current_version'] = self._versionconfig.serialize(version, context)
 
-        serialized_version = self._versionconfig.search.format(**context)
+        serialized_version = format_map(self._versionconfig.search, context)
 
         if self.contains(serialized_version):
             return
@@ -118,34 +343,83 @@ class ConfiguredFile(object):
         assert False, msg
 
     def contains(self, search):
-        with io.open(self.path, 'rb') as f:
-            search_lines = search.splitlines()
-            lookbehind = []
-
-            for lineno, line in enumerate(f.readlines()):
-                lookbehind.append(line.decode('utf-8').rstrip("\n"))
-
-                if len(lookbehind) > len(search_lines):
-                    lookbehind = lookbehind[1:]
-
-                if (search_lines[0] in lookbehind[0] and
-                            search_lines[-1] in lookbehind[-1] and
-                            search_lines[1:-1] == lookbehind[1:-1]):
-                    logger.info("Found '{}' in {} at line {}: {}".format(
-                        search, self.path, lineno - (len(lookbehind) - 1), line.decode('utf-8').rstrip()))
-                    return True
-        return False
+        """
+        Check whether the (possibly multi-line) search string occurs in the file.
 
-    def replace(self, current_version, new_version, context, dry_run):
+        The first search line may be a suffix of a file line and the last one
+        a prefix, all lines in between have to match exactly. File lines are
+        kept in a fixed-size ring buffer and the middle lines are compared
+        through a rolling (Rabin-Karp) hash of their line hashes, so no list
+        is built or sliced per line.
+        """
+        search_lines = search.splitlines()
+        first, last = search_lines[0], search_lines[-1]
+        middle = search_lines[1:-1]
+
+        middle_hash = 0
+        for middle_line in middle:
+            middle_hash = (middle_hash * _HASH_BASE + hash(middle_line)) % _HASH_MODULUS
+        # weight of the oldest line hash when it leaves the rolling window
+        oldest_weight = pow(_HASH_BASE, len(middle) - 1, _HASH_MODULUS) if middle else 0
+
+        window = deque(maxlen=len(search_lines))
+        window_hashes = deque(maxlen=len(middle))
+        rolling_hash = 0
+
+        content = self._content_cache.read(self.path)
+
+        for lineno, line in enumerate(io.StringIO(content)):
+            line = line.rstrip("\n")
+            window.append(line)
+
+            if (first in window[0] and last in line and (
+                    not middle or (
+                        len(window) == window.maxlen and
+                        rolling_hash == middle_hash and
+                        all(a == b for a, b in zip(islice(window, 1, None), middle))))):
+                logger.info("Found '%s' in %s at line %s: %s",
+                            search, self.path, lineno - (len(window) - 1), line.rstrip())
+                return True
+
+            if middle:
+                line_hash = hash(line) % _HASH_MODULUS
+                if len(window_hashes) == window_hashes.maxlen:
+                    rolling_hash -= window_hashes[0] * oldest_weight
+                rolling_hash = (rolling_hash * _HASH_BASE + line_hash) % _HASH_MODULUS
+                window_hashes.append(line_hash)
 
-        with io.open(self.path, 'rb') as f:
-            file_content_before = f.read().decode('utf-8')
+        return False
 
+    def templates(self, current_version, new_version, context):
+        """
+        :return: the rendered (search, replace) strings
+        """
         context['current_version'] = self._versionconfig.serialize(current_version, context)
         context['new_version'] = self._versionconfig.serialize(new_version, context)
 
-        search_for = self._versionconfig.search.format(**context)
-        replace_with = self._versionconfig.replace.format(**context)
+        return format_map(self._versionconfig.search, context), format_map(self._versionconfig.replace, context)
+
+    def plan_patch(self, current_version, new_version, context, index):
+        """
+        Plan the change as a FilePatch of the offsets in an OccurrenceIndex,
+        without reading the file, or return None if it isn't indexed or
+        changed since.
+        """
+        search_for, replace_with = self.templates(current_version, new_version, context)
+        offsets = index.plan(os.path.normpath(self.path), search_for, replace_with)
+        if offsets is None:
+            return None
+        return FilePatch(offsets, search_for, replace_with)
+
+    def plan_replace(self, current_version, new_version, context, content=None):
+        """
+        Compute the new content of the file without writing it.
+        :param content: the content to replace in, instead of the file's
+        :return: FileChange
+        """
+        file_content_before = self._content_cache.read(self.path) if content is None else content
+
+        search_for, replace_with = self.templates(current_version, new_version, context)
 
         file_content_after = file_content_before.replace(
             search_for, replace_with
@@ -153,32 +427,56 @@ class ConfiguredFile(object):
 
         if file_content_before == file_content_after:
             # TODO expose this to be configurable
+            search_for = current_version.original
             file_content_after = file_content_before.replace(
-                current_version.original,
+                search_for,
                 replace_with,
             )
 
-        if file_content_before != file_content_after:
-            logger.info("{} file {}:".format(
-                "Would change" if dry_run else "Changing",
-                self.path,
-            ))
-            logger.info("\n".join(list(unified_diff(
-                file_content_before.splitlines(),
-                file_content_after.splitlines(),
-                lineterm="",
-                fromfile="a/" + self.path,
-                tofile="b/" + self.path
-            ))))
+        return FileChange(file_content_before, file_content_after, search_for, replace_with)
+
+    def diff(self, change):
+        """
+        Unified diff lines of a FileChange, computed from the replaced spans.
+        """
+        from bumpversion.diff import replacement_diff
+
+        return replacement_diff(
+            change.content_before,
+            change.search,
+            change.replacement,
+            fromfile="a/" + self.path,
+            tofile="b/" + self.path,
+        )
+
+    def log_replace(self, change, dry_run):
+        if isinstance(change, FilePatch):
+            logger.info("Changing file %s in place: '%s' -> '%s' at %s indexed offsets",
+                        self.path, change.search, change.replacement, len(change.offsets))
+        elif change.changed:
+            logger.info("%s file %s:", "Would change" if dry_run else "Changing", self.path)
+            # building the diff is expensive for large files, skip it unless it's logged
+            if logger.isEnabledFor(logging.INFO):
+                logger.info("\n".join(self.diff(change)))
         else:
-            logger.info("{} file {}".format(
-                "Would not change" if dry_run else "Not changing",
-                self.path,
-            ))
+            logger.info("%s file %s", "Would not change" if dry_run else "Not changing", self.path)
+
+    def write(self, file_content):
+        return self._content_cache.write(self.path, file_content)
 
-        if not dry_run:
-            with io.open(self.path, 'wb') as f:
-                f.write(file_content_after.encode('utf-8'))
+    def patch(self, change, index):
+        """
+        Apply a FilePatch planned with plan_patch().
+        """
+        index.patch(os.path.normpath(self.path), change.offsets, change.replacement, self._content_cache.fsync)
+
+    def replace(self, current_version, new_version, context, dry_run):
+        change = self.plan_replace(current_version, new_version, context)
+
+        self.log_replace(change, dry_run)
+
+        if not dry_run and change.changed:
+            self.write(change.content_after)
 
     def __str__(self):
         return self.path
@@ -187,6 +485,127 @@ class ConfiguredFile(object):
         return '<bumpversion.ConfiguredFile:{}>'.format(self.path)
 
 
+class PinnedFile(ConfiguredFile):
+    """
+    A file pinning the version of another project, from a
+    [bumpversion:depends:...] section: search and replace are rendered with
+    that project's old and new version strings.
+    """
+
+    def __init__(self, path, search, replace, current_version, new_version, content_cache=None):
+        super(PinnedFile, self).__init__(path, None, content_cache)
+        self._search = search
+        self._replace = replace
+        self._versions = {'current_version': current_version, 'new_version': new_version}
+
+    def templates(self, current_version, new_version, context):
+        context = LayeredContext(self._versions, context)
+        return format_map(self._search, context), format_map(self._replace, context)
+
+    def plan_replace(self, current_version, new_version, context, content=None):
+        file_content_before = self._content_cache.read(self.path) if content is None else content
+
+        search_for, replace_with = self.templates(current_version, new_version, context)
+
+        return FileChange(
+            file_content_before, file_content_before.replace(search_for, replace_with), search_for, replace_with)
+
+    def __repr__(self):
+        return '<bumpversion.PinnedFile:{}>'.format(self.path)
+
+
+def default_jobs():
+    import multiprocessing
+
+    try:
+        return multiprocessing.cpu_count()
+    except NotImplementedError:
+        return 1
+
+
+def replace_in_files(replacements, new_version, context, dry_run, jobs=1, transaction=None, index=None):
+    """
+    Replace the version in several files, using up to `jobs` threads.
+
+    :param replacements: list of (ConfiguredFile, current Version) tuples
+    :param transaction: Transaction to add the changed files to, instead of
+        writing them
+    :param index: OccurrenceIndex to patch unchanged files in place with,
+        and to index the written files in; not for dry runs or transactions
+    :return: list of FileChange, or FilePatch for files patched in place
+
+    The new content of every file is computed before anything is written,
+    so an error in one file leaves all files untouched. Changes are logged
+    in the order of `replacements`, whatever order the threads finish in.
+    Replacements in the same file apply one after the other, and the file is
+    written once.
+    """
+    indexes_by_path = OrderedDict()
+    for position, (configured_file, _) in enumerate(replacements):
+        indexes_by_path.setdefault(os.path.normpath(configured_file.path), []).append(position)
+    same_file = list(indexes_by_path.values())
+
+    def plan(indexes):
+        if index is not None and len(indexes) == 1:
+            configured_file, current_version = replacements[indexes[0]]
+            patch = configured_file.plan_patch(current_version, new_version, LayeredContext(context), index)
+            if patch is not None:
+                return [patch]
+
+        planned = []
+        content = None
+        for position in indexes:
+            configured_file, current_version = replacements[position]
+            change = configured_file.plan_replace(current_version, new_version, LayeredContext(context), content)
+            content = change.content_after
+            planned.append(change)
+        return planned
+
+    def write(indexes):
+        first, last = changes[indexes[0]], changes[indexes[-1]]
+        configured_file = replacements[indexes[-1]][0]
+        if isinstance(last, FilePatch):
+            configured_file.patch(last, index)
+        elif first.content_before != last.content_after:
+            configured_file.write(last.content_after)
+            if index is not None:
+                index.record(os.path.normpath(configured_file.path), last.content_after.encode('utf-8'),
+                             [changes[i].replacement for i in indexes])
+
+    pool = None
+    map_ = map
+    if jobs > 1 and len(same_file) > 1:
+        from multiprocessing.pool import ThreadPool
+
+        pool = ThreadPool(min(jobs, len(same_file)))
+        map_ = pool.map
+
+    try:
+        changes = [None] * len(replacements)
+        for indexes, planned in zip(same_file, map_(plan, same_file)):
+            for position, change in zip(indexes, planned):
+                changes[position] = change
+
+        for (configured_file, _), change in zip(replacements, changes):
+            configured_file.log_replace(change, dry_run)
+
+        if dry_run:
+            pass
+        elif transaction is not None:
+            for indexes in same_file:
+                first, last = changes[indexes[0]], changes[indexes[-1]]
+                if first.content_before != last.content_after:
+                    transaction.add(replacements[indexes[-1]][0].path, first.content_before, last.content_after)
+        else:
+            list(map_(write, same_file))
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+
+    return changes
+
+
 class IncompleteVersionRepresenationException(Exception):
     def __init__(self, message):
         self.message = message
@@ -206,22 +625,138 @@ def keyvaluestring(d):
     return ", ".join("{}={}".format(k, v) for k, v in sorted(d.items()))
 
 
+class LazyKeyValueString(object):
+    """
+    Formats a mapping (or Version) with keyvaluestring() only when it's
+    actually logged.
+    """
+
+    __slots__ = ('_d',)
+
+    def __init__(self, d):
+        self._d = d
+
+    def __str__(self):
+        return keyvaluestring(self._d)
+
+
+_LABEL_INDEXES = {}
+
+
+def _interned_labels(labels):
+    """
+    Return a shared copy of the labels tuple and its label -> position index.
+    """
+    labels = tuple(labels)
+    interned = _LABEL_INDEXES.get(labels)
+    if interned is None:
+        interned = _LABEL_INDEXES.setdefault(
+            labels, (labels, dict((label, i) for i, label in enumerate(labels))))
+    return interned
+
+
 class Version(object):
-    def __init__(self, values, original=None):
-        self._values = dict(values)
-        self.original = original
+    """
+    An immutable version: the labels of its parts and their VersionPart values,
+    stored as two tuples.
+
+    Labels are ordered like the given order (usually VersionConfig.order()),
+    followed by any other labels. All versions with the same labels share one
+    labels tuple and index, so a version costs little more than its parts.
+
+    Versions with the same labels are ordered by sort_key, a tuple of the
+    parts' sort keys (the number of numeric parts, the position in the values
+    list of value parts), computed once per version. Pass it as key to
+    sorted(), max() etc. to compare at plain tuple speed.
+    """
+
+    __slots__ = ('_labels', '_index', '_parts', '_original', '_hash', '_sort_key')
+
+    def __init__(self, values, original=None, order=None):
+        values = dict(values)
+        labels = [label for label in order or () if label in values]
+        labels.extend(label for label in values if label not in labels)
+
+        self._labels, self._index = _interned_labels(labels)
+        self._parts = tuple(values[label] for label in self._labels)
+        self._original = original
+        self._hash = None
+        self._sort_key = None
+
+    @classmethod
+    def _from_parts(cls, labels, parts, original=None):
+        version = cls.__new__(cls)
+        version._labels, version._index = _interned_labels(labels)
+        version._parts = tuple(parts)
+        version._original = original
+        version._hash = None
+        version._sort_key = None
+        return version
+
+    @property
+    def original(self):
+        return self._original
 
     def __getitem__(self, key):
-        return self._values[key]
+        return self._parts[self._index[key]]
+
+    def __contains__(self, key):
+        return key in self._index
 
     def __len__(self):
-        return len(self._values)
+        return len(self._parts)
 
     def __iter__(self):
-        return iter(self._values)
+        return iter(self._labels)
+
+    def items(self):
+        return zip(self._labels, self._parts)
+
+    def __eq__(self, other):
+        if not isinstance(other, Version):
+            return NotImplemented
+        return self._labels == other._labels and self._parts == other._parts
+
+    def __ne__(self, other):
+        equal = self.__eq__(other)
+        return equal if equal is NotImplemented else not equal
+
+    def __hash__(self):
+        if self._hash is None:
+            self._hash = hash((self._labels, self._parts))
+        return self._hash
+
+    @property
+    def sort_key(self):
+        if self._sort_key is None:
+            self._sort_key = tuple(part.sort_key() for part in self._parts)
+        return self._sort_key
+
+    def _comparable(self, other):
+        return isinstance(other, Version) and self._labels == other._labels
+
+    def __lt__(self, other):
+        if not self._comparable(other):
+            return NotImplemented
+        return self.sort_key < other.sort_key
+
+    def __le__(self, other):
+        if not self._comparable(other):
+            return NotImplemented
+        return self.sort_key <= other.sort_key
+
+    def __gt__(self, other):
+        if not self._comparable(other):
+            return NotImplemented
+        return self.sort_key > other.sort_key
+
+    def __ge__(self, other):
+        if not self._comparable(other):
+            return NotImplemented
+        return self.sort_key >= other.sort_key
 
     def __repr__(self):
-        return '<bumpversion.Version:{}>'.format(keyvaluestring(self._values))
+        return '<bumpversion.Version:{}>'.format(keyvaluestring(self))
 
     def compare(self, order, version_to_compare):
         """
@@ -232,34 +767,145 @@ class Version(object):
         """
         result = {}
         for label in order:
-            if label not in self._values:
+            if label not in self._index:
                 continue
             else:
-                if label not in version_to_compare._values:
+                if label not in version_to_compare._index:
                     result[label] = True
                 else:
-                    result[label] = (self._values[label].value == version_to_compare._values[label].value)
+                    result[label] = (self[label].value == version_to_compare[label].value)
         return result
 
     def bump(self, part_name, order):
         bumped = False
 
-        new_values = {}
+        labels = []
+        parts = []
 
         for label in order:
-            if not label in self._values:
+            if not label in self._index:
                 continue
-            elif label == part_name:
-                new_values[label] = self._values[label].bump()
+
+            part = self[label]
+            if label == part_name:
+                part = part.bump()
                 bumped = True
             elif bumped:
-                new_values[label] = self._values[label].null()
-            else:
-                new_values[label] = self._values[label].copy()
+                part = part.null()
+
+            labels.append(label)
+            parts.append(part)
+
+        return Version._from_parts(labels, parts)
+
 
-        new_version = Version(new_values)
+# number of version shapes each VersionConfig remembers the serialization format for
+FORMAT_CACHE_SIZE = 64
 
-        return new_version
+# number of distinct parse/serialize combinations compiled once per process
+COMPILED_VERSION_CONFIG_CACHE_SIZE = 256
+
+# number of distinct values of a part that parse_many() shares between versions
+PARSE_MANY_SHARED_PARTS = 1024
+
+
+class SerializeFormat(object):
+    """
+    A serialization format, parsed once: its literal text segments, the
+    labels of its replacement fields and the set of labels it requires.
+    """
+
+    def __init__(self, format_string):
+        self.format_string = format_string
+
+        literals = []
+        labels = []
+        for literal, label, _, _ in Formatter().parse(format_string):
+            literals.append(literal)
+            if label:
+                labels.append(label)
+
+        self.literals = tuple(literals)
+        self.labels = tuple(labels)
+        self.required = frozenset(labels)
+
+    def render(self, values):
+        return format_map(self.format_string, values)
+
+    def __str__(self):
+        return self.format_string
+
+    def __repr__(self):
+        return '<bumpversion.SerializeFormat:{}>'.format(self.format_string)
+
+
+class CompiledVersionConfig(object):
+    """
+    The parts of a VersionConfig that only depend on its parse regex and
+    serialization formats: the compiled regex and formats and the order of
+    labels.
+    """
+
+    def __init__(self, parse, serialize):
+        self.parse_regex = re.compile(parse, re.VERBOSE)
+
+        # the (verbose) regex on a single line, for logging
+        self.regexp_one_line = "".join([l.split("#")[0].strip() for l in self.parse_regex.pattern.splitlines()])
+
+        self.formats = [SerializeFormat(f) for f in serialize]
+        self.formats_by_string = dict((f.format_string, f) for f in self.formats)
+        # currently, order depends on the first given serialization format
+        # this seems like a good idea because this should be the most complete format
+        self.order = self.formats[0].labels
+
+        # labels of parsed versions: the ones in order() first, then other groups of the regex
+        groups = sorted(self.parse_regex.groupindex, key=self.parse_regex.groupindex.get)
+        self.version_labels = _interned_labels(
+            [label for label in self.order if label in groups] +
+            [label for label in groups if label not in self.order])[0]
+        self.all_labels = frozenset(label for f in self.formats for label in f.labels)
+
+
+class CompiledVersionConfigCache(object):
+    """
+    Process-wide LRU cache of CompiledVersionConfig objects by parse regex
+    and serialization formats, so that file sections with the same ones share
+    a single compilation. ``hits`` counts the compilations avoided.
+    """
+
+    def __init__(self, size):
+        self.size = size
+        self.hits = 0
+        self.misses = 0
+        self._compiled = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, parse, serialize):
+        key = (parse, tuple(serialize))
+
+        with self._lock:
+            compiled = self._compiled.pop(key, None)
+            if compiled is not None:
+                self.hits += 1
+                self._compiled[key] = compiled
+                return compiled
+
+        compiled = CompiledVersionConfig(parse, serialize)
+
+        with self._lock:
+            self.misses += 1
+            self._compiled[key] = compiled
+            if len(self._compiled) > self.size:
+                self._compiled.popitem(last=False)
+
+        return compiled
+
+    def clear(self):
+        with self._lock:
+            self._compiled.clear()
+
+
+compiled_version_configs = CompiledVersionConfigCache(COMPILED_VERSION_CONFIG_CACHE_SIZE)
 
 
 class VersionConfig(object):
@@ -270,12 +916,23 @@ class VersionConfig(object):
     def __init__(self, parse, serialize, search, replace, part_configs=None):
 
         try:
-            self.parse_regex = re.compile(parse, re.VERBOSE)
-        except sre_constants.error as e:
+            compiled = compiled_version_configs.get(parse, serialize)
+        except re.error as e:
             logger.error("--parse '{}' is not a valid regex".format(parse))
             raise e
 
+        self.parse_regex = compiled.parse_regex
+        self._regexp_one_line = compiled.regexp_one_line
+
         self.serialize_formats = serialize
+        self._compiled_formats = compiled.formats
+        self._formats_by_string = compiled.formats_by_string
+        self._order = compiled.order
+        self._version_labels = compiled.version_labels
+        self._all_labels = compiled.all_labels
+        # the chosen format depends on part_configs too, so it is not shared
+        self._format_cache = OrderedDict()
+        self._format_cache_lock = threading.Lock()
 
         if not part_configs:
             part_configs = {}
@@ -284,38 +941,53 @@ class VersionConfig(object):
         self.search = search
         self.replace = replace
 
+    @property
+    def part_configs(self):
+        return self._part_configs
+
+    @part_configs.setter
+    def part_configs(self, part_configs):
+        self._part_configs = part_configs
+        self.clear_format_cache()
+
+    def clear_format_cache(self):
+        with self._format_cache_lock:
+            self._format_cache.clear()
+
+    def _compiled_format(self, serialize_format):
+        if isinstance(serialize_format, SerializeFormat):
+            return serialize_format
+        compiled = self._formats_by_string.get(serialize_format)
+        if compiled is None:
+            compiled = SerializeFormat(serialize_format)
+        return compiled
+
     def _labels_for_format(self, serialize_format):
-        return (
-            label
-            for _, label, _, _ in Formatter().parse(serialize_format)
-            if label
-        )
+        return iter(self._compiled_format(serialize_format).labels)
 
     def order(self):
-        # currently, order depends on the first given serialization format
-        # this seems like a good idea because this should be the most complete format
-        return self._labels_for_format(self.serialize_formats[0])
+        return self._order
 
     def parse(self, version_string):
 
-        regexp_one_line = "".join([l.split("#")[0].strip() for l in self.parse_regex.pattern.splitlines()])
-
-        logger.info("Parsing version '{}' using regexp '{}'".format(version_string, regexp_one_line))
+        logger.info("Parsing version '%s' using regexp '%s'", version_string, self._regexp_one_line)
 
         match = self.parse_regex.search(version_string)
 
-        _parsed = {}
         if not match:
-            logger.warn("Evaluating 'parse' option: '{}' does not parse current version '{}'".format(
-                self.parse_regex.pattern, version_string))
+            logger.warning("Evaluating 'parse' option: '%s' does not parse current version '%s'",
+                           self.parse_regex.pattern, version_string)
             return
 
-        for key, value in match.groupdict().items():
-            _parsed[key] = VersionPart(value, self.part_configs.get(key))
-
-        v = Version(_parsed, version_string)
+        part_configs = self.part_configs
+        v = Version._from_parts(
+            self._version_labels,
+            [VersionPart(match.group(label), part_configs.get(label)) for label in self._version_labels],
+            version_string,
+        )
 
-        logger.info("Parsed the following values: %s" % keyvaluestring(v._values))
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("Parsed the following values: %s", keyvaluestring(v))
 
         return v
 
@@ -325,15 +997,15 @@ class VersionConfig(object):
 
         Raises MissingValueForSerializationException if not serializable
         """
-        values = context.copy()
-        for k in version:
-            values[k] = version[k]
+        serialize_format = self._compiled_format(serialize_format)
+
+        values = LayeredContext(version, context)
 
         # TODO dump complete context on debug level
 
         try:
             # test whether all parts required in the format have values
-            serialized = serialize_format.format(**values)
+            serialized = serialize_format.render(values)
 
         except KeyError as e:
             missing_key = getattr(e,
@@ -344,11 +1016,27 @@ class VersionConfig(object):
                 "Did not find key {} in {} when serializing version number".format(
                     repr(missing_key), repr(version)))
 
+        # try whether all parsed keys are represented
+        if raise_if_incomplete:
+            keys_needing_representation = self._keys_needing_representation(version, context)
+            if not (keys_needing_representation <= serialize_format.required):
+                raise IncompleteVersionRepresenationException(
+                    "Could not represent '{}' in format '{}'".format(
+                        "', '".join(keys_needing_representation ^ serialize_format.required),
+                        serialize_format,
+                    ))
+
+        return serialized
+
+    def _keys_needing_representation(self, version, context):
         keys_needing_representation = set()
         found_required = False
 
-        for k in self.order():
-            v = values[k]
+        for k in self._order:
+            try:
+                v = version[k]
+            except KeyError:
+                v = context[k]
 
             if not isinstance(v, VersionPart):
                 # values coming from environment variables don't need
@@ -361,26 +1049,55 @@ class VersionConfig(object):
             elif not found_required:
                 keys_needing_representation.add(k)
 
-        required_by_format = set(self._labels_for_format(serialize_format))
-
-        # try whether all parsed keys are represented
-        if raise_if_incomplete:
-            if not (keys_needing_representation <= required_by_format):
-                raise IncompleteVersionRepresenationException(
-                    "Could not represent '{}' in format '{}'".format(
-                        "', '".join(keys_needing_representation ^ required_by_format),
-                        serialize_format,
-                    ))
+        return keys_needing_representation
 
-        return serialized
+    def _version_shape(self, version, context):
+        """
+        The keys of version needing representation, which is all that decides
+        the serialization format, as long as every format can be rendered.
+        Returns None if some format misses a value.
+        """
+        for label in self._all_labels:
+            if label not in context:
+                try:
+                    version[label]
+                except KeyError:
+                    return None
+        return frozenset(self._keys_needing_representation(version, context))
 
     def _choose_serialize_format(self, version, context):
+        shape = self._version_shape(version, context)
+        if shape is None:
+            # let the trial serialization report the missing value
+            return self._try_serialize_formats(version, context)
+
+        with self._format_cache_lock:
+            chosen = self._format_cache.get(shape)
+            if chosen is not None:
+                # mark as most recently used
+                self._format_cache[shape] = self._format_cache.pop(shape)
+                return chosen
+
+        # same choice as _try_serialize_formats(): the last complete format, or the first one
+        chosen = None
+        for serialize_format in self._compiled_formats:
+            if shape <= serialize_format.required or not chosen:
+                chosen = serialize_format
+
+        with self._format_cache_lock:
+            self._format_cache[shape] = chosen
+            if len(self._format_cache) > FORMAT_CACHE_SIZE:
+                self._format_cache.popitem(last=False)
+
+        return chosen
+
+    def _try_serialize_formats(self, version, context):
 
         chosen = None
 
         # logger.info("Available serialization formats: '{}'".format("', '".join(self.serialize_formats)))
 
-        for serialize_format in self.serialize_formats:
+        for serialize_format in self._compiled_formats:
             try:
                 self._serialize(version, serialize_format, context, raise_if_incomplete=True)
                 chosen = serialize_format
@@ -404,12 +1121,100 @@ class VersionConfig(object):
         serialized = self._serialize(version, self._choose_serialize_format(version, context), context)
         return serialized
 
+    def parse_many(self, version_strings):
+        """
+        Parse many version strings without logging each of them.
+
+        Yields a Version for every string, or None if it doesn't parse.
+        """
+        search = self.parse_regex.search
+        labels = self._version_labels
+        configs = [self.part_configs.get(label) for label in labels]
+        from_parts = Version._from_parts
+
+        # parts are immutable, so versions parsed here share equal parts; the
+        # shared parts are dropped once there are too many of them, to keep
+        # the memory use of streaming through many distinct versions constant
+        parts_by_value = [{} for _ in labels]
+
+        def part(index, value):
+            shared = parts_by_value[index]
+            try:
+                return shared[value]
+            except KeyError:
+                if len(shared) >= PARSE_MANY_SHARED_PARTS:
+                    shared.clear()
+                created = shared[value] = VersionPart(value, configs[index])
+                return created
+
+        for version_string in version_strings:
+            match = search(version_string)
+            if not match:
+                yield None
+                continue
+            yield from_parts(
+                labels,
+                [part(index, match.group(label)) for index, label in enumerate(labels)],
+                version_string,
+            )
+
+    def bump_many(self, versions, part):
+        """
+        Bump part of many versions, yielding the new versions (None stays None).
+        """
+        order = self.order()
+        for version in versions:
+            yield None if version is None else version.bump(part, order)
+
+    def serialize_many(self, versions, context=None):
+        """
+        Serialize many versions, yielding the strings (None stays None).
+        """
+        if context is None:
+            context = {}
+        for version in versions:
+            yield None if version is None else self.serialize(version, context)
+
+    def to_array(self, versions):
+        """
+        Return the numeric parts of versions as a NumPy structured array.
+
+        The array has an int64 field for every part in order() that uses a
+        numeric function, holding its first number, and a boolean ``parsed``
+        field that is False for rows of versions that are None. Requires numpy.
+        """
+        try:
+            import numpy
+        except ImportError:
+            raise ImportError("VersionConfig.to_array() requires numpy")
+
+        labels = [
+            label for label in self._order
+            if isinstance(self.part_configs.get(label, DEFAULT_PART_CONFIGURATION).function, NumericFunction)
+        ]
+        first_numeric = NumericFunction.FIRST_NUMERIC.search
+
+        rows = []
+        for version in versions:
+            if version is None:
+                rows.append(tuple([False] + [0] * len(labels)))
+            else:
+                rows.append(tuple(
+                    [True] + [int(first_numeric(version[label].value).group(2)) for label in labels]))
+
+        dtype = [(str('parsed'), numpy.bool_)] + [(str(label), numpy.int64) for label in labels]
+        return numpy.array(rows, dtype=dtype)
+
 
 OPTIONAL_ARGUMENTS_THAT_TAKE_VALUES = [
     '--parse',
     '--serialize',
     '--search',
     '--replace',
+    '--jobs',
+    '-j',
+    '--tag-name',
+    '--message',
     '-m'
 ]
 
@@ -430,45 +1235,55 @@ def split_args_in_optional_and_positional(args):
     # manually parsing positional arguments because stupid argparse can't mix
     # positional and optional arguments
 
-    positions = []
-    for i, arg in enumerate(args):
-
-        previous = None
-
-        if i > 0:
-            previous = args[i - 1]
+    positionals = []
+    optionals = []
 
+    previous = None
+    for arg in args:
         if ((not arg.startswith('-')) and
                 (previous not in OPTIONAL_ARGUMENTS_THAT_TAKE_VALUES)):
-            positions.append(i)
-
-    positionals = [arg for i, arg in enumerate(args) if i in positions]
-    args = [arg for i, arg in enumerate(args) if i not in positions]
+            positionals.append(arg)
+        else:
+            optionals.append(arg)
+        previous = arg
 
-    return (positionals, args)
+    return (positionals, optionals)
 
 
 def main(original_args=None):
-    positionals, args = split_args_in_optional_and_positional(
-        sys.argv[1:] if original_args is None else original_args
-    )
+    if original_args is None:
+        original_args = sys.argv[1:]
 
-    if len(positionals[1:]) > 2:
-        warnings.warn(
-            "Giving multiple files on the command line will be deprecated, please use [bumpversion:file:...] in a config file.",
-            PendingDeprecationWarning)
+    if '--serve' in original_args:
+        from bumpversion.daemon import serve_main
+        return serve_main(original_args)
 
-    parser1 = argparse.ArgumentParser(add_help=False)
+    if '--monorepo' in original_args:
+        from bumpversion.monorepo import monorepo_main
+        return monorepo_main(original_args)
 
-    parser1.add_argument(
-        '--verbose', action='count', default=0,
-        help='Print verbose logging to stderr', required=False)
+    bump(original_args)
 
-    parser1.add_argument(
-        '--list', action='store_true', default=False,
-        help='List machine readable information', required=False)
 
-    known_args, remaining_argv = parser1.parse_known_args(args)
+def bump(original_args, dependency_versions=None):
+    """
+    Bump the project in the current directory, as the bumpversion command.
+
+    :param dependency_versions: (old, new) version strings by absolute path
+        of the projects named in [bumpversion:depends:...] sections, whose
+        pins get updated
+    :return: (current version, new version) strings
+    """
+    import argparse
+
+    from bumpversion.arguments import DiscardDefaultIfSpecifiedAppendAction
+
+    positionals, args = split_args_in_optional_and_positional(original_args)
+
+    if len(positionals[1:]) > 2:
+        warnings.warn(
+            "Giving multiple files on the command line will be deprecated, please use [bumpversion:file:...] in a config file.",
+            PendingDeprecationWarning)
 
     logformatter = logging.Formatter('%(message)s')
 
@@ -482,28 +1297,7 @@ def main(original_args=None):
         ch2.setFormatter(logformatter)
         logger_list.addHandler(ch2)
 
-    if known_args.list:
-        logger_list.setLevel(1)
-
-    log_level = {
-        0: logging.WARNING,
-        1: logging.INFO,
-        2: logging.DEBUG,
-    }.get(known_args.verbose, logging.DEBUG)
-
-    logger.setLevel(log_level)
-
-    logger.debug("Starting {}".format(DESCRIPTION))
-
-    defaults = {}
-    vcs_info = {}
-
-    config = RawConfigParser('')
-
-    # don't transform keys to lowercase (which would be the default)
-    config.optionxform = lambda option: option
-
-    config.add_section('bumpversion')
+    vcs_info = GitContext()
 
     # We need setup.py to get the major, minor versions
     ver_sources = ['setup.py', 'plugin.json', 'VERSION']
@@ -513,197 +1307,257 @@ def main(original_args=None):
         logger.error(message)
         sys.exit(2)
     # We don't work with other configuration files except .bumpversion.cfg
-    config_file = '.bumpversion.cfg'
+    config_file = CONFIG_FILE
     if not os.path.exists(config_file):
         message = "Could not read {} file".format(config_file)
         logger.error(message)
         sys.exit(2)
 
-    part_configs = {}
+    content_cache = ContentCache()
+    compiled_hits = compiled_version_configs.hits
+    compiled_misses = compiled_version_configs.misses
 
-    files = []
+    config_content = content_cache.read(config_file)
+    config, config_from_cache = load_config(config_content)
 
-    logger.info("Reading config file {}:".format(config_file))
-    logger.info(io.open(config_file, 'rt', encoding='utf-8').read())
-
-    config.readfp(io.open(config_file, 'rt', encoding='utf-8'))
-
-    log_config = StringIO()
-    config.write(log_config)
-
-    if 'files' in dict(config.items("bumpversion")):
+    if 'files' in config.defaults:
         warnings.warn(
             "'files =' configuration is will be deprecated, please use [bumpversion:file:...]",
             PendingDeprecationWarning
         )
 
-    defaults.update(dict(config.items("bumpversion")))
-
-    for listvaluename in ("serialize",):
-        try:
-            value = config.get("bumpversion", listvaluename)
-            defaults[listvaluename] = list(filter(None, (x.strip() for x in value.splitlines())))
-        except NoOptionError:
-            pass  # no default value then ;)
-
-    for boolvaluename in "dry_run":
-        try:
-            defaults[boolvaluename] = config.getboolean("bumpversion", boolvaluename)
-        except NoOptionError:
-            pass  # no default value then ;)
-
-    for section_name in config.sections():
-
-        section_name_match = re.compile("^bumpversion:(file|part):(.+)").match(section_name)
-
-        if not section_name_match:
-            continue
-
-        section_prefix, section_value = section_name_match.groups()
-
-        section_config = dict(config.items(section_name))
-
-        if section_prefix == "part":
-
-            ThisVersionPartConfiguration = NumericVersionPartConfiguration
+    defaults = dict(config.defaults)
 
-            if 'values' in section_config:
-                section_config['values'] = list(
-                    filter(None, (x.strip() for x in section_config['values'].splitlines())))
-                ThisVersionPartConfiguration = ConfiguredVersionPartConfiguration
-
-            part_configs[section_value] = ThisVersionPartConfiguration(**section_config)
-
-        elif section_prefix == "file":
-
-            filename = section_value
-
-            if 'serialize' in section_config:
-                section_config['serialize'] = list(
-                    filter(None, (x.strip() for x in section_config['serialize'].splitlines())))
-
-            section_config['part_configs'] = part_configs
+    part_configs = {}
+    for part_name, section_config in config.parts:
+        if 'values' in section_config:
+            part_configs[part_name] = ConfiguredVersionPartConfiguration(**section_config)
+        else:
+            part_configs[part_name] = NumericVersionPartConfiguration(**section_config)
 
-            if not 'parse' in section_config:
-                section_config['parse'] = defaults.get("parse", '(?P<major>\d+)\.(?P<minor>\d+)\.(?P<patch>\d+)')
+    files = [
+        ConfiguredFile(filename, VersionConfig(part_configs=part_configs, **section_config), content_cache)
+        for filename, section_config in config.files
+    ]
 
-            if not 'serialize' in section_config:
-                section_config['serialize'] = defaults.get('serialize', [str('{major}.{minor}.{patch}')])
+    file_names = []
+    if 'files' in defaults:
+        assert defaults['files'] != None
+        file_names = defaults['files'].split(' ')
 
-            if not 'search' in section_config:
-                section_config['search'] = defaults.get("search", '{current_version}')
+    # a single parser: the config file provides the defaults, the command line overrides them
+    parser = argparse.ArgumentParser(
+        prog='bumpversion',
+        description=DESCRIPTION,
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    parser.set_defaults(**defaults)
 
-            if not 'replace' in section_config:
-                section_config['replace'] = defaults.get("replace", '{new_version}')
+    parser.add_argument(
+        '--verbose', action='count', default=0,
+        help='Print verbose logging to stderr', required=False)
+    parser.add_argument(
+        '--list', action='store_true', default=False,
+        help='List machine readable information', required=False)
+    parser.add_argument('--parse', metavar='REGEX',
+                        help='Regex parsing the version string',
+                        default=defaults.get("parse", DEFAULT_PARSE))
+    parser.add_argument('--serialize', metavar='FORMAT',
+                        action=DiscardDefaultIfSpecifiedAppendAction,
+                        help='How to format what is parsed back to a version',
+                        default=defaults.get("serialize", list(DEFAULT_SERIALIZE)))
+    parser.add_argument('--search', metavar='SEARCH',
+                        help='Template for complete string to search',
+                        default=defaults.get("search", DEFAULT_SEARCH))
+    parser.add_argument('--replace', metavar='REPLACE',
+                        help='Template for complete string to replace',
+                        default=defaults.get("replace", DEFAULT_REPLACE))
+    parser.add_argument('--dry-run', '-n', action='store_true',
+                        default=defaults.get('dry_run', False), help="Don't write any files, just pretend.")
+    parser.add_argument('--jobs', '-j', metavar='N', type=int,
+                        default=defaults.get('jobs', default_jobs()),
+                        help="Number of files to update in parallel")
+    parser.add_argument('--fsync', action='store_true',
+                        default=defaults.get('fsync', False),
+                        help="Flush written files to disk before returning")
+    parser.add_argument('--transactional', action='store_true',
+                        default=defaults.get('transactional', False),
+                        help="Write all files or none, rolling back on failure")
+    parser.add_argument('--allow-dirty', action='store_true',
+                        default=defaults.get('allow_dirty', False),
+                        help="Don't abort if the bumped files have uncommitted changes")
+    commit_group = parser.add_mutually_exclusive_group()
+    commit_group.add_argument('--commit', action='store_true', dest='commit',
+                              default=defaults.get('commit', False),
+                              help='Commit to version control')
+    commit_group.add_argument('--no-commit', action='store_false', dest='commit',
+                              default=argparse.SUPPRESS,
+                              help='Do not commit to version control')
+    tag_group = parser.add_mutually_exclusive_group()
+    tag_group.add_argument('--tag', action='store_true', dest='tag',
+                           default=defaults.get('tag', False),
+                           help='Create a tag in version control (only works with --commit)')
+    tag_group.add_argument('--no-tag', action='store_false', dest='tag',
+                           default=argparse.SUPPRESS,
+                           help='Do not create a tag in version control')
+    parser.add_argument('--tag-name', metavar='TAG_NAME',
+                        default=defaults.get('tag_name', 'v{new_version}'),
+                        help='Tag name (only works with --tag)')
+    parser.add_argument('--message', '-m', metavar='COMMIT_MSG',
+                        default=defaults.get('message', 'Bump version: {current_version} → {new_version}'),
+                        help='Commit message')
+    parser.add_argument('part', help='Part of the version to be bumped.')
+    parser.add_argument('files', metavar='file', nargs='*', help='Files to change', default=file_names)
+
+    args = parser.parse_args(args + positionals)
+
+    if os.path.isdir(JOURNAL_DIRECTORY):
+        if args.dry_run:
+            # a dry run doesn't touch any files, not even to roll back
+            logger.warning("Found the journal of an interrupted bump in %s, a run without --dry-run rolls it back",
+                           JOURNAL_DIRECTORY)
+        else:
+            from bumpversion.transaction import recover
+            if config_file in recover():
+                # the configuration read above is the one of the interrupted bump
+                return bump(original_args, dependency_versions)
 
-            files.append(ConfiguredFile(filename, VersionConfig(**section_config)))
+    if args.list:
+        logger_list.setLevel(1)
 
-    parser2 = argparse.ArgumentParser(prog='bumpversion', add_help=False, parents=[parser1])
-    parser2.set_defaults(**defaults)
+    log_level = {
+        0: logging.WARNING,
+        1: logging.INFO,
+        2: logging.DEBUG,
+    }.get(args.verbose, logging.DEBUG)
 
-    parser2.add_argument('--parse', metavar='REGEX',
-                         help='Regex parsing the version string',
-                         default=defaults.get("parse", '(?P<major>\d+)\.(?P<minor>\d+)\.(?P<patch>\d+)'))
-    parser2.add_argument('--serialize', metavar='FORMAT',
-                         action=DiscardDefaultIfSpecifiedAppendAction,
-                         help='How to format what is parsed back to a version',
-                         default=defaults.get("serialize", [str('{major}.{minor}.{patch}')]))
-    parser2.add_argument('--search', metavar='SEARCH',
-                         help='Template for complete string to search',
-                         default=defaults.get("search", '{current_version}'))
-    parser2.add_argument('--replace', metavar='REPLACE',
-                         help='Template for complete string to replace',
-                         default=defaults.get("replace", '{new_version}'))
+    logger.setLevel(log_level)
 
-    known_args, remaining_argv = parser2.parse_known_args(args)
+    logger.debug("Starting %s", DESCRIPTION)
 
-    defaults.update(vars(known_args))
+    logger.info("Reading config file %s:", config_file)
+    logger.info(config_content)
+    if config_from_cache:
+        logger.info("Using the cached resolved configuration")
 
-    assert type(known_args.serialize) == list
+    assert type(args.serialize) == list
 
-    context = dict(list(time_context.items()) + list(prefixed_environ().items()) + list(vcs_info.items()))
+    # the time is read once per run, and only if a template uses it
+    context = LayeredContext(vcs_info, prefixed_environ(), TimeContext())
 
     try:
         vc = VersionConfig(
-            parse=known_args.parse,
-            serialize=known_args.serialize,
-            search=known_args.search,
-            replace=known_args.replace,
+            parse=args.parse,
+            serialize=args.serialize,
+            search=args.search,
+            replace=args.replace,
             part_configs=part_configs,
         )
-    except sre_constants.error as e:
+    except re.error as e:
         sys.exit(1)
 
-    current_version = vc.parse(known_args.current_version) if known_args.current_version else None
+    current_version = vc.parse(args.current_version) if args.current_version else None
     leave_config_ver = True
     new_version = None
-    if len(positionals) > 0:
-        setup_version, zero_patch_setup_version = ConfiguredFile(ver_source, vc).find(positionals[0])
-        compare = setup_version.compare(vc.order(), current_version)
-        for part in compare:
-            if part == positionals[0]:
-                continue
-            else:
-                leave_config_ver = leave_config_ver and compare[part]
-
-        try:
-            if leave_config_ver and current_version:
-                logger.info("Attempting to increment part '{}'".format(positionals[0]))
-                new_version = current_version.bump(positionals[0], vc.order())
-                logger.info("Values are now: " + keyvaluestring(new_version._values))
-                defaults['new_version'] = vc.serialize(new_version, context)
-            elif not leave_config_ver:
-                logger.info("Using Version from {}".format(ver_source))
-                defaults['new_version'] = vc.serialize(zero_patch_setup_version, context)
-                new_version = zero_patch_setup_version
-                logger.info("Values are now: " + keyvaluestring(setup_version._values))
-        except MissingValueForSerializationException as e:
-            logger.info("Opportunistic finding of new_version failed: " + e.message)
-        except IncompleteVersionRepresenationException as e:
-            logger.info("Opportunistic finding of new_version failed: " + e.message)
-        except KeyError as e:
-            logger.info("Opportunistic finding of new_version failed")
-    parser3 = argparse.ArgumentParser(
-        prog='bumpversion',
-        description=DESCRIPTION,
-        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
-        conflict_handler='resolve',
-        parents=[parser2],
-    )
-
-    parser3.set_defaults(**defaults)
-
-    parser3.add_argument('--dry-run', '-n', action='store_true',
-                         default=False, help="Don't write any files, just pretend.")
-
-    file_names = []
-    if 'files' in defaults:
-        assert defaults['files'] != None
-        file_names = defaults['files'].split(' ')
+    setup_version, zero_patch_setup_version = ConfiguredFile(ver_source, vc, content_cache).find(args.part)
+    compare = setup_version.compare(vc.order(), current_version)
+    for part in compare:
+        if part == args.part:
+            continue
+        else:
+            leave_config_ver = leave_config_ver and compare[part]
 
-    parser3.add_argument('part', help='Part of the version to be bumped.')
-    parser3.add_argument('files', metavar='file', nargs='*', help='Files to change', default=file_names)
-    args = parser3.parse_args(remaining_argv + positionals)
+    try:
+        if leave_config_ver and current_version:
+            logger.info("Attempting to increment part '%s'", args.part)
+            new_version = current_version.bump(args.part, vc.order())
+            logger.info("Values are now: %s", LazyKeyValueString(new_version))
+            args.new_version = vc.serialize(new_version, context)
+        elif not leave_config_ver:
+            logger.info("Using Version from %s", ver_source)
+            args.new_version = vc.serialize(zero_patch_setup_version, context)
+            new_version = zero_patch_setup_version
+            logger.info("Values are now: %s", LazyKeyValueString(setup_version))
+    except MissingValueForSerializationException as e:
+        logger.info("Opportunistic finding of new_version failed: " + e.message)
+    except IncompleteVersionRepresenationException as e:
+        logger.info("Opportunistic finding of new_version failed: " + e.message)
+    except KeyError as e:
+        logger.info("Opportunistic finding of new_version failed")
+
+    content_cache.fsync = args.fsync
 
     if args.dry_run:
         logger.info("Dry run active, won't touch any files.")
 
     # make sure files exist and contain version string
     # if leave_config_ver and new_version:
-    logger.info("Update info in {}".format(ver_source))
-    ConfiguredFile(ver_source, vc).replace(setup_version, new_version, context, args.dry_run)
-    config.set('bumpversion', 'new_version', args.new_version)
+    logger.info("Update info in %s", ver_source)
+    replacements = [(ConfiguredFile(ver_source, vc, content_cache), setup_version)]
 
-    for key, value in config.items('bumpversion'):
+    files.extend(ConfiguredFile(file_name, vc, content_cache) for file_name in args.files)
+    seen_paths = set([os.path.normpath(ver_source)])
+    for configured_file in files:
+        if os.path.normpath(configured_file.path) in seen_paths:
+            continue
+        seen_paths.add(os.path.normpath(configured_file.path))
+        replacements.append((configured_file, current_version or setup_version))
+
+    for dependency_path, section_config in config.depends:
+        versions = (dependency_versions or {}).get(os.path.abspath(dependency_path))
+        if versions is not None:
+            logger.info("Update pin of %s in %s", dependency_path, section_config['file'])
+            replacements.append((PinnedFile(
+                section_config['file'], section_config['search'], section_config['replace'],
+                versions[0], versions[1], content_cache), None))
+
+    commit_paths = []
+    if args.commit:
+        import subprocess
+
+        # the dirty check, and which of the bumped files git tracks
+        seen_paths = set()
+        for path in [configured_file.path for configured_file, _ in replacements] + [config_file]:
+            if os.path.abspath(path) not in seen_paths:
+                seen_paths.add(os.path.abspath(path))
+                commit_paths.append(path)
+        try:
+            git_status = vcs_info.git.status(commit_paths)
+        except subprocess.CalledProcessError as e:
+            logger.error("Unable to commit, git failed: {}".format(e.output.decode('utf-8', 'replace').strip()))
+            sys.exit(2)
+        except OSError as e:
+            logger.error("Unable to commit, git is not available: {}".format(e))
+            sys.exit(2)
+        if git_status.dirty and not args.allow_dirty:
+            message = "Git working directory is not clean:\n{}".format(
+                "\n".join(os.path.relpath(path) for path in git_status.dirty))
+            logger.warning("{}\n\nUse --allow-dirty to override this if you know what you're doing.".format(message))
+            raise WorkingDirectoryIsDirtyException(message)
+        commit_paths = [path for path in commit_paths if os.path.abspath(path) not in git_status.untracked]
+
+    transaction = None
+    if args.transactional and not args.dry_run:
+        from bumpversion.transaction import Transaction
+        transaction = Transaction(content_cache.write, fsync=args.fsync)
+
+    index = None
+    if config.defaults.get('occurrence_index') and not args.dry_run and transaction is None:
+        from bumpversion.index import OccurrenceIndex
+        index = OccurrenceIndex()
+
+    replace_in_files(replacements, new_version, context, args.dry_run, max(1, args.jobs), transaction, index)
+    if index is not None:
+        index.save()
+    for key, value in config.items_with('new_version', args.new_version):
         logger_list.info("{}={}".format(key, value))
 
-    config.remove_option('bumpversion', 'new_version')
-
-    config.set('bumpversion', 'current_version', args.new_version)
-
-    new_config = StringIO()
-
-    try:
+    if config.written is None:
+        warnings.warn(
+            "Unable to write UTF-8 to config file, because of an old configparser version. "
+            "Update with `pip install --upgrade configparser`."
+        )
+    else:
         write_to_config_file = not args.dry_run
 
         logger.info("{} to config file {}:".format(
@@ -711,15 +1565,52 @@ def main(original_args=None):
             config_file,
         ))
 
-        config.write(new_config)
-        logger.info(new_config.getvalue())
-
-        if write_to_config_file:
-            with io.open(config_file, 'wb') as f:
-                f.write(new_config.getvalue().encode('utf-8'))
-
-    except UnicodeEncodeError:
-        warnings.warn(
-            "Unable to write UTF-8 to config file, because of an old configparser version. "
-            "Update with `pip install --upgrade configparser`."
-        )
+        new_config = config.write(args.new_version)
+        logger.info(new_config)
+
+        if transaction is not None:
+            transaction.add(config_file, config_content, new_config)
+        elif write_to_config_file:
+            content_cache.write(config_file, new_config)
+
+    if transaction is not None:
+        transaction.commit()
+
+    if config.written is not None and not args.dry_run:
+        # so that the next run finds the config it is going to read, once
+        # it's written for good
+        store_config(new_config, config.bumped(args.new_version))
+
+    if args.commit and not commit_paths:
+        logger.warning("Not committing to Git, it doesn't track any of the bumped files")
+    elif args.commit:
+        vcs_context = LayeredContext({'current_version': args.current_version, 'new_version': args.new_version},
+                                     context)
+        commit_message = format_map(args.message, vcs_context)
+        tag_name = format_map(args.tag_name, vcs_context) if args.tag else None
+        try:
+            logger.info("%s to Git with message '%s'", "Would commit" if args.dry_run else "Committing",
+                        commit_message)
+            if not args.dry_run:
+                vcs_info.git.commit(commit_message, commit_paths)
+            if tag_name is not None:
+                logger.info("%s '%s' in Git", "Would tag" if args.dry_run else "Tagging", tag_name)
+                if not args.dry_run:
+                    vcs_info.git.tag(tag_name)
+        except subprocess.CalledProcessError as e:
+            logger.error("Unable to commit, git failed: {}".format(e.output.decode('utf-8', 'replace').strip()))
+            sys.exit(2)
+        except OSError as e:
+            logger.error("Unable to commit, git is not available: {}".format(e))
+            sys.exit(2)
+
+    logger.info("File content cache: %s hits, %s misses", content_cache.hits, content_cache.misses)
+    logger.info("Wrote %s bytes to %s files", content_cache.bytes_written, content_cache.files_written)
+    if index is not None:
+        logger.info("Patched %s indexed files in place", index.files_patched)
+    logger.info("Spawned %s git processes", vcs_info.spawns)
+    logger.info("Compiled version configurations: %s reused, %s compiled",
+                compiled_version_configs.hits - compiled_hits,
+                compiled_version_configs.misses - compiled_misses)
+
+    return args.current_version, args.new_version
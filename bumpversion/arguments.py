@@ -0,0 +1,19 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import unicode_literals
+
+from argparse import _AppendAction
+
+
+class DiscardDefaultIfSpecifiedAppendAction(_AppendAction):
+    '''
+    Fixes bug http://bugs.python.org/issue16399 for 'append' action
+    '''
+
+    def __call__(self, parser, namespace, values, option_string=None):
+        if getattr(self, "_discarded_default", None) is None:
+            setattr(namespace, self.dest, [])
+            self._discarded_default = True
+
+        super(DiscardDefaultIfSpecifiedAppendAction, self).__call__(
+            parser, namespace, values, option_string=None)
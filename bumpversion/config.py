@@ -0,0 +1,275 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import unicode_literals
+
+import io
+import os
+import re
+import threading
+from collections import OrderedDict
+
+CONFIG_FILE = '.bumpversion.cfg'
+CONFIG_CACHE_DIRECTORY = '.bumpversion.cache'
+JOURNAL_DIRECTORY = '.bumpversion.journal'
+INDEX_FILE = '.bumpversion.index'
+
+DEFAULT_PARSE = '(?P<major>\\d+)\\.(?P<minor>\\d+)\\.(?P<patch>\\d+)'
+DEFAULT_SERIALIZE = [str('{major}.{minor}.{patch}')]
+DEFAULT_SEARCH = '{current_version}'
+DEFAULT_REPLACE = '{new_version}'
+
+# defaults of [bumpversion:depends:...] sections
+DEFAULT_PIN_FILE = 'setup.py'
+DEFAULT_PIN_SEARCH = '=={current_version}'
+DEFAULT_PIN_REPLACE = '=={new_version}'
+
+_SECTION_NAME = re.compile("^bumpversion:(file|part|depends):(.+)")
+
+# number of resolved configs a long-running process keeps in memory
+RESOLVED_CONFIG_MEMORY_SIZE = 64
+
+_resolved_configs = OrderedDict()
+_resolved_configs_lock = threading.Lock()
+
+# stands in for current_version in the written back config file
+_CURRENT_VERSION_PLACEHOLDER = '\x00current_version\x00'
+
+
+class ResolvedConfig(object):
+    """
+    What main() uses of .bumpversion.cfg, as plain data:
+
+    - items: the (key, value) pairs of the [bumpversion] section, in order
+    - defaults: the same as a dict, with list and boolean values converted
+    - parts: (name, options) of every [bumpversion:part:...] section
+    - files: (path, options) of every [bumpversion:file:...] section, with
+      parse, serialize, search and replace filled in from defaults
+    - depends: (project path, options) of every [bumpversion:depends:...]
+      section, with the pinning file, search and replace filled in
+    - written: the config file as written back, split around the new
+      current_version, or None if this configparser can't write it
+    """
+
+    def __init__(self, items, defaults, parts, files, depends, written):
+        self.items = items
+        self.defaults = defaults
+        self.parts = parts
+        self.files = files
+        self.depends = depends
+        self.written = written
+
+    def items_with(self, key, value):
+        """
+        The [bumpversion] items after setting key to value.
+        """
+        items = [(k, value if k == key else v) for k, v in self.items]
+        if key not in self.defaults:
+            items.append((key, value))
+        return items
+
+    def write(self, current_version):
+        """
+        The config file content with current_version set.
+        """
+        return current_version.join(self.written)
+
+    def bumped(self, current_version):
+        """
+        The ResolvedConfig of write(current_version), without parsing it.
+        """
+        items = [item for item in self.items_with('current_version', current_version) if item[0] != 'new_version']
+        defaults = dict(self.defaults, current_version=current_version)
+        defaults.pop('new_version', None)
+        return ResolvedConfig(items, defaults, self.parts, self.files, self.depends, self.written)
+
+    def as_dict(self):
+        return {
+            'items': self.items,
+            'defaults': self.defaults,
+            'parts': self.parts,
+            'files': self.files,
+            'depends': self.depends,
+            'written': self.written,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(
+            [tuple(item) for item in data['items']],
+            data['defaults'],
+            [tuple(part) for part in data['parts']],
+            [tuple(file_) for file_ in data['files']],
+            [tuple(depends) for depends in data['depends']],
+            data['written'],
+        )
+
+
+def _lines(value):
+    return list(filter(None, (x.strip() for x in value.splitlines())))
+
+
+def resolve_config(content):
+    """
+    Parse the content of a .bumpversion.cfg file into a ResolvedConfig.
+    """
+    try:
+        from configparser import RawConfigParser, NoOptionError
+    except ImportError:
+        from ConfigParser import RawConfigParser, NoOptionError
+
+    try:
+        from StringIO import StringIO
+    except ImportError:
+        from io import StringIO
+
+    config = RawConfigParser('')
+
+    # don't transform keys to lowercase (which would be the default)
+    config.optionxform = lambda option: option
+
+    config.add_section('bumpversion')
+    config.readfp(io.StringIO(content, newline=None))
+
+    items = config.items("bumpversion")
+    defaults = dict(items)
+
+    for listvaluename in ("serialize",):
+        try:
+            defaults[listvaluename] = _lines(config.get("bumpversion", listvaluename))
+        except NoOptionError:
+            pass  # no default value then ;)
+
+    for boolvaluename in ("dry_run", "fsync", "config_cache", "transactional", "occurrence_index",
+                           "commit", "tag", "allow_dirty"):
+        try:
+            defaults[boolvaluename] = config.getboolean("bumpversion", boolvaluename)
+        except NoOptionError:
+            pass  # no default value then ;)
+
+    parts = []
+    files = []
+    depends = []
+
+    for section_name in config.sections():
+
+        section_name_match = _SECTION_NAME.match(section_name)
+
+        if not section_name_match:
+            continue
+
+        section_prefix, section_value = section_name_match.groups()
+
+        section_config = dict(config.items(section_name))
+
+        if section_prefix == "part":
+
+            if 'values' in section_config:
+                section_config['values'] = _lines(section_config['values'])
+
+            parts.append((section_value, section_config))
+
+        elif section_prefix == "file":
+
+            if 'serialize' in section_config:
+                section_config['serialize'] = _lines(section_config['serialize'])
+
+            section_config.setdefault('parse', defaults.get("parse", DEFAULT_PARSE))
+            section_config.setdefault('serialize', defaults.get('serialize', list(DEFAULT_SERIALIZE)))
+            section_config.setdefault('search', defaults.get("search", DEFAULT_SEARCH))
+            section_config.setdefault('replace', defaults.get("replace", DEFAULT_REPLACE))
+
+            files.append((section_value, section_config))
+
+        elif section_prefix == "depends":
+
+            section_config.setdefault('file', DEFAULT_PIN_FILE)
+            section_config.setdefault('search', DEFAULT_PIN_SEARCH)
+            section_config.setdefault('replace', DEFAULT_PIN_REPLACE)
+
+            depends.append((section_value, section_config))
+
+    config.remove_option('bumpversion', 'new_version')
+    config.set('bumpversion', 'current_version', _CURRENT_VERSION_PLACEHOLDER)
+
+    written = StringIO()
+    try:
+        config.write(written)
+        written = written.getvalue().split(_CURRENT_VERSION_PLACEHOLDER)
+    except UnicodeEncodeError:
+        written = None
+
+    return ResolvedConfig(items, defaults, parts, files, depends, written)
+
+
+def _cache_path(content, cache_directory):
+    import hashlib
+
+    from bumpversion import __VERSION__
+
+    key = hashlib.sha1(__VERSION__.encode('utf-8') + b'\0' + content.encode('utf-8')).hexdigest()
+    return os.path.join(cache_directory, '{}.json'.format(key))
+
+
+def load_config(content, cache_directory=CONFIG_CACHE_DIRECTORY):
+    """
+    Resolve the content of a .bumpversion.cfg file, from memory if this
+    process resolved it before, or from the on-disk cache in cache_directory
+    if it has an entry for this content and bumpversion version.
+    Returns (ResolvedConfig, whether it came from either cache).
+
+    On a miss, the entry is written if the config sets `config_cache = True`.
+    """
+    import json
+
+    with _resolved_configs_lock:
+        resolved = _resolved_configs.pop(content, None)
+        if resolved is not None:
+            _resolved_configs[content] = resolved
+            return resolved, True
+
+    from_cache = True
+    try:
+        with io.open(_cache_path(content, cache_directory), 'r', encoding='utf-8') as f:
+            resolved = ResolvedConfig.from_dict(json.load(f))
+    except (IOError, OSError, ValueError, KeyError, TypeError):
+        # no or unusable entry, resolve it again
+        from_cache = False
+        resolved = resolve_config(content)
+        store_config(content, resolved, cache_directory)
+
+    _remember(content, resolved)
+    return resolved, from_cache
+
+
+def _remember(content, resolved):
+    with _resolved_configs_lock:
+        _resolved_configs[content] = resolved
+        if len(_resolved_configs) > RESOLVED_CONFIG_MEMORY_SIZE:
+            _resolved_configs.popitem(last=False)
+
+
+def store_config(content, resolved, cache_directory=CONFIG_CACHE_DIRECTORY):
+    """
+    Cache resolved as the ResolvedConfig of content, replacing the entries for
+    other contents, if it sets `config_cache = True`.
+    """
+    import json
+
+    from bumpversion import atomic_write
+
+    if not resolved.defaults.get('config_cache'):
+        return
+
+    _remember(content, resolved)
+
+    path = _cache_path(content, cache_directory)
+    directory = os.path.dirname(path)
+    try:
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+        for name in os.listdir(directory):
+            if name.endswith('.json'):
+                os.remove(os.path.join(directory, name))
+        atomic_write(path, json.dumps(resolved.as_dict()).encode('utf-8'))
+    except (IOError, OSError):
+        pass  # the cache is optional
@@ -0,0 +1,193 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import unicode_literals
+
+import os
+import threading
+from datetime import datetime
+from string import Formatter
+
+try:
+    from collections.abc import Mapping, MutableMapping
+except ImportError:
+    from collections import Mapping, MutableMapping
+
+
+class EnvironmentContext(Mapping):
+    """
+    The environment variables as a read-only mapping of `$NAME` keys, looked
+    up in os.environ when a template asks for them instead of copied upfront.
+    """
+
+    def __init__(self, environ=None):
+        self._environ = os.environ if environ is None else environ
+
+    def __getitem__(self, key):
+        if not key.startswith("$"):
+            raise KeyError(key)
+        return self._environ[key[1:]]
+
+    def __contains__(self, key):
+        return key.startswith("$") and key[1:] in self._environ
+
+    def __iter__(self):
+        for key in self._environ:
+            yield "${}".format(key)
+
+    def __len__(self):
+        return len(self._environ)
+
+
+class TimeContext(Mapping):
+    """
+    `now` and `utcnow`, read from the clock when first asked for and then
+    kept, so every template rendered with this context sees the same time.
+    """
+
+    KEYS = ('now', 'utcnow')
+
+    def __init__(self):
+        self._values = None
+        # templates are rendered on several threads
+        self._lock = threading.Lock()
+
+    def __getitem__(self, key):
+        if key not in self.KEYS:
+            raise KeyError(key)
+        with self._lock:
+            if self._values is None:
+                self._values = {
+                    'now': datetime.now(),
+                    'utcnow': datetime.utcnow(),
+                }
+            return self._values[key]
+
+    def __contains__(self, key):
+        return key in self.KEYS
+
+    def __iter__(self):
+        return iter(self.KEYS)
+
+    def __len__(self):
+        return len(self.KEYS)
+
+
+class GitContext(Mapping):
+    """
+    `commit_sha`, `distance_to_latest_tag` and `dirty` from `git describe`.
+    bumpversion.vcs is only imported, and git only run, once a template asks
+    for one of them. Outside a repository, or without a v* tag, the keys are
+    missing.
+    """
+
+    KEYS = ('commit_sha', 'distance_to_latest_tag', 'dirty')
+
+    def __init__(self):
+        self._git = None
+        self._values = None
+        # templates are rendered on several threads
+        self._lock = threading.Lock()
+
+    @property
+    def git(self):
+        """
+        The bumpversion.vcs.Git running the git processes of this bump.
+        """
+        if self._git is None:
+            from bumpversion.vcs import Git
+            self._git = Git()
+        return self._git
+
+    @property
+    def spawns(self):
+        return 0 if self._git is None else self._git.spawns
+
+    def _describe(self):
+        with self._lock:
+            if self._values is None:
+                import subprocess
+
+                try:
+                    _, distance, commit_sha, dirty = self.git.describe()
+                    self._values = {
+                        'commit_sha': commit_sha,
+                        'distance_to_latest_tag': distance,
+                        'dirty': dirty,
+                    }
+                except (subprocess.CalledProcessError, OSError, ValueError):
+                    self._values = {}
+            return self._values
+
+    def __getitem__(self, key):
+        if key not in self.KEYS:
+            raise KeyError(key)
+        return self._describe()[key]
+
+    def __contains__(self, key):
+        return key in self.KEYS and key in self._describe()
+
+    def __iter__(self):
+        return iter(self._describe())
+
+    def __len__(self):
+        return len(self._describe())
+
+
+class LayeredContext(MutableMapping):
+    """
+    A mapping looking up keys in several layers in order, without copying
+    them. Writes go to the first layer, which is a dict of its own.
+
+    Layers only need `__getitem__` raising KeyError; iterating or sizing the
+    context also needs them to be iterable.
+    """
+
+    def __init__(self, *layers):
+        self.layers = [{}] + list(layers)
+
+    def __getitem__(self, key):
+        for layer in self.layers:
+            try:
+                return layer[key]
+            except KeyError:
+                pass
+        raise KeyError(key)
+
+    def __contains__(self, key):
+        for layer in self.layers:
+            if key in layer:
+                return True
+        return False
+
+    def __setitem__(self, key, value):
+        self.layers[0][key] = value
+
+    def __delitem__(self, key):
+        del self.layers[0][key]
+
+    def __iter__(self):
+        seen = set()
+        for layer in self.layers:
+            for key in layer:
+                if key not in seen:
+                    seen.add(key)
+                    yield key
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+
+if hasattr('', 'format_map'):
+    def format_map(template, values):
+        """
+        template.format(**values), but only looking up the keys template uses.
+        """
+        return template.format_map(values)
+else:
+    _formatter = Formatter()
+
+    def format_map(template, values):
+        """
+        template.format(**values), but only looking up the keys template uses.
+        """
+        return _formatter.vformat(template, (), values)
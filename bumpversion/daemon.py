@@ -0,0 +1,223 @@
+# -*- coding: utf-8 -*-
+"""
+A resident bumpversion process serving bumps over a Unix socket.
+
+The protocol is one JSON line per connection in each direction:
+
+- request: ``{"cwd": "/path/to/repository", "args": ["--dry-run", "patch"]}``
+- response: ``{"status": 0, "stdout": "...", "stderr": "..."}``
+
+Requests run main() in the daemon process, which keeps the compiled version
+configurations and resolved config files of earlier requests.
+"""
+
+from __future__ import unicode_literals
+
+import io
+import json
+import logging
+import os
+import socket
+import sys
+import tempfile
+import threading
+import traceback
+
+try:
+    import socketserver
+except ImportError:
+    import SocketServer as socketserver
+
+import bumpversion
+
+logger = logging.getLogger("bumpversion.daemon")
+
+# no Unix sockets on Windows, and no daemon: bumpversion-client runs bumps in
+# its own process there
+HAS_UNIX_SOCKETS = hasattr(socket, 'AF_UNIX') and hasattr(os, 'getuid')
+
+# main() changes the working directory and the process' output streams, so
+# requests run one at a time, whatever repository they are for
+_request_lock = threading.Lock()
+
+
+def default_socket_path():
+    """
+    $BUMPVERSION_SOCKET, or a socket in the user's $XDG_RUNTIME_DIR, or in
+    the temporary directory if there is none.
+    """
+    return os.environ.get('BUMPVERSION_SOCKET') or os.path.join(
+        os.environ.get('XDG_RUNTIME_DIR') or tempfile.gettempdir(), 'bumpversion-{}.sock'.format(os.getuid()))
+
+
+def _handler(stream):
+    handler = logging.StreamHandler(stream)
+    handler.setFormatter(logging.Formatter('%(message)s'))
+    return handler
+
+
+def run(cwd, args):
+    """
+    Run main(args) in cwd, returning (status, stdout, stderr).
+    """
+    return capture(cwd, bumpversion.main, args)[:3]
+
+
+def capture(cwd, function, *args, **kwargs):
+    """
+    Call function(*args, **kwargs) in cwd, capturing what it logs and prints.
+    Returns (exit status, stdout, stderr, return value).
+    """
+    with _request_lock:
+        stdout, stderr = io.StringIO(), io.StringIO()
+        saved = (os.getcwd(), sys.stdout, sys.stderr, bumpversion.logger.handlers, bumpversion.logger_list.handlers,
+                 bumpversion.logger_list.level)
+        status = 0
+        value = None
+        try:
+            os.chdir(cwd)
+            sys.stdout, sys.stderr = stdout, stderr
+            bumpversion.logger.handlers = [_handler(stderr)]
+            bumpversion.logger_list.handlers = [_handler(stdout)]
+            # --list only applies to the request asking for it, whatever the
+            # level of the root logger of this process
+            bumpversion.logger_list.setLevel(logging.WARNING)
+            value = function(*args, **kwargs)
+        except SystemExit as e:
+            if e.code is None or isinstance(e.code, int):
+                status = e.code or 0
+            else:
+                status = 1
+                stderr.write("{}\n".format(e.code))
+        except Exception:
+            status = 1
+            stderr.write(traceback.format_exc())
+        finally:
+            os.chdir(saved[0])
+            sys.stdout, sys.stderr = saved[1], saved[2]
+            bumpversion.logger.handlers, bumpversion.logger_list.handlers = saved[3], saved[4]
+            bumpversion.logger_list.setLevel(saved[5])
+        return status, stdout.getvalue(), stderr.getvalue(), value
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+
+    def handle(self):
+        try:
+            request = json.loads(self.rfile.readline().decode('utf-8'))
+            status, stdout, stderr = run(request['cwd'], list(request['args']))
+        except (ValueError, KeyError, TypeError) as e:
+            status, stdout, stderr = 2, "", "Invalid request: {}\n".format(e)
+        response = {'status': status, 'stdout': stdout, 'stderr': stderr}
+        self.wfile.write(json.dumps(response).encode('utf-8') + b'\n')
+
+
+if HAS_UNIX_SOCKETS:
+    class Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+        daemon_threads = True
+
+
+def make_server(socket_path):
+    """
+    Bind a Server to socket_path, replacing a stale socket file. Only the
+    user running the daemon can connect to it.
+    """
+    if os.path.exists(socket_path):
+        try:
+            _connect(socket_path).close()
+        except (IOError, OSError):
+            os.unlink(socket_path)
+        else:
+            raise RuntimeError("A daemon is already serving on {}".format(socket_path))
+
+    # created with mode 0600, not made private after the fact
+    umask = os.umask(0o177)
+    try:
+        return Server(socket_path, _RequestHandler)
+    finally:
+        os.umask(umask)
+
+
+def serve_main(args):
+    """
+    bumpversion --serve [--socket PATH]
+    """
+    if not HAS_UNIX_SOCKETS:
+        logger.error("bumpversion --serve needs Unix sockets, which %s doesn't have", sys.platform)
+        sys.exit(2)
+
+    import argparse
+
+    parser = argparse.ArgumentParser(prog='bumpversion --serve', description=bumpversion.DESCRIPTION)
+    parser.add_argument('--serve', action='store_true', required=True,
+                        help='Serve bumps over a Unix socket until interrupted')
+    parser.add_argument('--socket', metavar='PATH', default=default_socket_path(),
+                        help='Path of the Unix socket')
+    args = parser.parse_args(args)
+
+    server = make_server(args.socket)
+    # only the daemon's own messages, the requests' output goes to the clients
+    logger.addHandler(_handler(sys.stderr))
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    logger.info("Serving on %s", args.socket)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        os.unlink(args.socket)
+
+
+def _connect(socket_path):
+    client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        client.connect(socket_path)
+    except Exception:
+        client.close()
+        raise
+    return client
+
+
+def request(args, cwd=None, socket_path=None):
+    """
+    Run args on the daemon, returning (status, stdout, stderr).
+
+    Raises IOError/OSError if no daemon is listening on socket_path, and
+    ValueError if it closed the connection without a complete response.
+    """
+    client = _connect(socket_path or default_socket_path())
+    try:
+        data = {'cwd': os.path.abspath(cwd or os.getcwd()), 'args': list(args)}
+        client.sendall(json.dumps(data).encode('utf-8') + b'\n')
+        with client.makefile('rb') as f:
+            response = json.loads(f.readline().decode('utf-8'))
+    finally:
+        client.close()
+    return response['status'], response['stdout'], response['stderr']
+
+
+def client_main(original_args=None):
+    """
+    Entry point of bumpversion-client: like bumpversion, but through the
+    daemon if one is running, and in this process otherwise.
+    """
+    args = sys.argv[1:] if original_args is None else original_args
+
+    if not HAS_UNIX_SOCKETS:
+        return bumpversion.main(args)
+
+    try:
+        status, stdout, stderr = request(args)
+    except (IOError, OSError, ValueError):
+        return bumpversion.main(args)
+
+    sys.stdout.write(stdout)
+    sys.stderr.write(stderr)
+    if status:
+        sys.exit(status)
+
+
+if __name__ == '__main__':
+    client_main()
@@ -0,0 +1,162 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import unicode_literals
+
+import re
+from difflib import SequenceMatcher, unified_diff
+
+# line boundaries str.splitlines() knows about, apart from "\n"
+_OTHER_LINE_BREAKS = re.compile('[\r\x0b\x0c\x1c\x1d\x1e\x85\u2028\u2029]')
+
+
+class _PrecomputedOpcodes(SequenceMatcher):
+    """
+    A SequenceMatcher that reports opcodes computed elsewhere, so that its
+    get_grouped_opcodes() can be reused for them.
+    """
+
+    def __init__(self, opcodes):
+        SequenceMatcher.__init__(self, None, [], [])
+        self._precomputed = opcodes
+
+    def get_opcodes(self):
+        return self._precomputed
+
+
+def _split(segment, at_end):
+    # a segment ends right before a "\n", unless it ends the text
+    return segment.splitlines() if at_end else segment.split("\n")
+
+
+def _changed_blocks(text, search, replacement):
+    """
+    Yield (first line, old lines, new lines) for every run of consecutive
+    lines touched by an occurrence of search in text, in order.
+    """
+    position = 0
+    line = 0
+    block = None  # [first line, last line, offset of first line, end of last occurrence]
+
+    while True:
+        start = text.find(search, position)
+        if start < 0:
+            break
+        end = start + len(search)
+
+        first = line + text.count("\n", position, start)
+        line = first + text.count("\n", start, end)
+        position = end
+
+        # occurrences on adjacent lines share a block, so that their changed
+        # lines are matched as one run, as difflib does
+        if block is not None and first > block[1] + 1:
+            yield _block_lines(text, search, replacement, block)
+            block = None
+
+        if block is None:
+            block = [first, line, text.rfind("\n", 0, start) + 1, end]
+        else:
+            block[1] = line
+            block[3] = end
+
+    if block is not None:
+        yield _block_lines(text, search, replacement, block)
+
+
+def _block_lines(text, search, replacement, block):
+    first, _, segment_start, occurrence_end = block
+    segment_end = text.find("\n", occurrence_end)
+    at_end = segment_end < 0
+    if at_end:
+        segment_end = len(text)
+    segment = text[segment_start:segment_end]
+    return (
+        first,
+        _split(segment, at_end),
+        _split(segment.replace(search, replacement), at_end),
+    )
+
+
+def _append(opcodes, opcode):
+    if opcodes and opcode[0] == opcodes[-1][0] == 'equal':
+        tag, i1, _, j1, _ = opcodes.pop()
+        opcode = (tag, i1, opcode[2], j1, opcode[4])
+    if opcode[1] != opcode[2] or opcode[3] != opcode[4]:
+        opcodes.append(opcode)
+
+
+def _span_diff(text, search, replacement, fromfile, tofile, n):
+    lines = text.splitlines()
+    new_lines_at = {}
+    opcodes = []
+    i = j = 0
+
+    for first, old_lines, new_lines in _changed_blocks(text, search, replacement):
+        _append(opcodes, ('equal', i, first, j, j + first - i))
+        j += first - i
+        i = first
+
+        for tag, i1, i2, j1, j2 in SequenceMatcher(None, old_lines, new_lines).get_opcodes():
+            _append(opcodes, (tag, i + i1, i + i2, j + j1, j + j2))
+        for offset, new_line in enumerate(new_lines):
+            new_lines_at[j + offset] = new_line
+
+        i += len(old_lines)
+        j += len(new_lines)
+
+    _append(opcodes, ('equal', i, len(lines), j, j + len(lines) - i))
+
+    started = False
+    for group in _PrecomputedOpcodes(opcodes).get_grouped_opcodes(n):
+        if not started:
+            started = True
+            yield '--- {}'.format(fromfile)
+            yield '+++ {}'.format(tofile)
+
+        first, last = group[0], group[-1]
+        yield '@@ -{} +{} @@'.format(
+            _format_range(first[1], last[2]), _format_range(first[3], last[4]))
+
+        for tag, i1, i2, j1, j2 in group:
+            if tag == 'equal':
+                for line in lines[i1:i2]:
+                    yield ' ' + line
+                continue
+            if tag in ('replace', 'delete'):
+                for line in lines[i1:i2]:
+                    yield '-' + line
+            if tag in ('replace', 'insert'):
+                for k in range(j1, j2):
+                    yield '+' + new_lines_at[k]
+
+
+def _format_range(start, stop):
+    # same as difflib's unified range format
+    beginning = start + 1
+    length = stop - start
+    if length == 1:
+        return '{}'.format(beginning)
+    if not length:
+        beginning -= 1
+    return '{},{}'.format(beginning, length)
+
+
+def replacement_diff(text, search, replacement, fromfile='', tofile='', n=3):
+    """
+    Generate the unified diff lines (without line terminators) between text
+    and text.replace(search, replacement).
+
+    Only the lines around the occurrences of search are compared, instead of
+    matching the whole old and new text against each other. Texts using line
+    boundaries other than "\\n" fall back to difflib.unified_diff.
+    """
+    if not search or _OTHER_LINE_BREAKS.search(text) or _OTHER_LINE_BREAKS.search(replacement):
+        return unified_diff(
+            text.splitlines(),
+            text.replace(search, replacement).splitlines(),
+            lineterm="",
+            fromfile=fromfile,
+            tofile=tofile,
+            n=n,
+        )
+    return _span_diff(text, search, replacement, fromfile, tofile, n)
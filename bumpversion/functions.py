@@ -38,6 +38,14 @@ class NumericFunction(object):
 
         return "".join([part_prefix, str(bumped_numeric), part_suffix])
 
+    def sort_key(self, value):
+        """
+        The number in value, for ordering values of this function.
+        """
+        if value.isdigit():
+            return int(value)
+        return int(self.FIRST_NUMERIC.search(value).group(2))
+
 
 class ValuesFunction(object):
     """
@@ -59,10 +67,15 @@ class ValuesFunction(object):
 
         self._values = values
 
+        # value -> position of its first occurrence, for constant time lookups
+        self._positions = {}
+        for position, value in enumerate(values):
+            self._positions.setdefault(value, position)
+
         if optional_value is None:
             optional_value = values[0]
 
-        if optional_value not in values:
+        if optional_value not in self._positions:
             raise ValueError("Optional value {0} must be included in values {1}".format(
                 optional_value, values))
 
@@ -71,15 +84,28 @@ class ValuesFunction(object):
         if first_value is None:
             first_value = values[0]
 
-        if first_value not in values:
+        if first_value not in self._positions:
             raise ValueError("First value {0} must be included in values {1}".format(
                 first_value, values))
 
         self.first_value = first_value
 
-    def bump(self, value):
+    def _position(self, value):
         try:
-            return self._values[self._values.index(value) + 1]
-        except IndexError:
+            return self._positions[value]
+        except KeyError:
+            raise ValueError(
+                "The value {!r} is not one of the {} configured values of this part.".format(value, len(self._values)))
+
+    def bump(self, value):
+        position = self._position(value) + 1
+        if position == len(self._values):
             raise ValueError(
                 "The part has already the maximum value among {} and cannot be bumped.".format(self._values))
+        return self._values[position]
+
+    def sort_key(self, value):
+        """
+        The position of value in the values list, for ordering values of this function.
+        """
+        return self._position(value)
@@ -0,0 +1,159 @@
+# -*- coding: utf-8 -*-
+"""
+A persistent index of where the version strings are in the configured files.
+
+For every file it wrote, bumpversion records the file's size, mtime and
+SHA-1, and the byte offsets of the strings the next bump is going to search
+for. As long as a file is unchanged, the next bump can then overwrite those
+bytes in place, instead of reading, searching and rewriting the whole file.
+"""
+
+from __future__ import unicode_literals
+
+import io
+import json
+import os
+import threading
+
+from bumpversion.config import INDEX_FILE
+
+
+def _sha1(data):
+    import hashlib
+
+    return hashlib.sha1(data).hexdigest()
+
+
+def _stat(path):
+    stat = os.stat(path)
+    return stat.st_size, getattr(stat, 'st_mtime_ns', stat.st_mtime)
+
+
+def find_offsets(data, needle):
+    """
+    Byte offsets of the non-overlapping occurrences of needle in data, the
+    ones str.replace() would replace.
+    """
+    offsets = []
+    position = data.find(needle)
+    while position >= 0:
+        offsets.append(position)
+        position = data.find(needle, position + len(needle))
+    return offsets
+
+
+class OccurrenceIndex(object):
+    """
+    The index in INDEX_FILE: by path, the size, mtime and SHA-1 of the file
+    and the offsets of the strings searched for in it.
+    """
+
+    def __init__(self, path=INDEX_FILE):
+        self.path = path
+        self.changed = False
+        self.files_patched = 0
+        self._lock = threading.Lock()
+        try:
+            with io.open(path, 'r', encoding='utf-8') as f:
+                self._files = json.load(f)['files']
+        except (IOError, OSError, ValueError, KeyError, TypeError):
+            self._files = {}
+
+    def record(self, path, data, strings):
+        """
+        Index data, just written to path, for the next searches for strings.
+        """
+        entry = {
+            'stat': list(_stat(path)),
+            'sha1': _sha1(data),
+            'offsets': dict((string, find_offsets(data, string.encode('utf-8'))) for string in strings),
+        }
+        with self._lock:
+            self._files[path] = entry
+            self.changed = True
+
+    def offsets(self, path, string):
+        """
+        The offsets of string in path, if path didn't change since it was
+        indexed, or None.
+        """
+        entry = self._files.get(path)
+        if entry is None or string not in entry['offsets']:
+            return None
+
+        try:
+            stat = _stat(path)
+        except OSError:
+            return None
+
+        if list(stat) != entry['stat']:
+            if entry['sha1'] is None or stat[0] != entry['stat'][0]:
+                return None
+            # touched, maybe not changed
+            with io.open(path, 'rb') as f:
+                if _sha1(f.read()) != entry['sha1']:
+                    return None
+            with self._lock:
+                entry['stat'] = list(stat)
+                self.changed = True
+
+        return entry['offsets'][string]
+
+    def plan(self, path, search, replacement):
+        """
+        The indexed offsets of search in path, if they can be overwritten with
+        replacement in place: path is unchanged, the bytes at every offset
+        still are search, and replacement has the same length in bytes.
+        Returns None otherwise.
+        """
+        search_bytes = search.encode('utf-8')
+        if search == replacement or len(search_bytes) != len(replacement.encode('utf-8')):
+            return None
+
+        offsets = self.offsets(path, search)
+        if not offsets:
+            return None
+
+        # cheap validation read, instead of reading the whole file
+        with io.open(path, 'rb') as f:
+            for offset in offsets:
+                f.seek(offset)
+                if f.read(len(search_bytes)) != search_bytes:
+                    return None
+        return offsets
+
+    def patch(self, path, offsets, replacement, fsync=False):
+        """
+        Overwrite the bytes at offsets in path with replacement, and reindex
+        path for replacement.
+
+        Unlike atomic_write(), this writes into the file itself, so a crash or
+        a full disk can leave it partly patched.
+        """
+        replacement_bytes = replacement.encode('utf-8')
+        with io.open(path, 'r+b') as f:
+            for offset in offsets:
+                f.seek(offset)
+                f.write(replacement_bytes)
+            if fsync:
+                f.flush()
+                os.fsync(f.fileno())
+
+        entry = {
+            'stat': list(_stat(path)),
+            # unknown without reading the whole file
+            'sha1': None,
+            'offsets': {replacement: offsets},
+        }
+        with self._lock:
+            self._files[path] = entry
+            self.changed = True
+            self.files_patched += 1
+
+    def save(self):
+        from bumpversion import atomic_write
+
+        with self._lock:
+            if self.changed:
+                atomic_write(self.path, json.dumps({'files': self._files}).encode('utf-8'))
+                self.changed = False
@@ -0,0 +1,241 @@
+# -*- coding: utf-8 -*-
+"""
+Bump every project of a repository: each directory containing a
+.bumpversion.cfg is bumped in that directory, on a process pool.
+
+Projects declaring [bumpversion:depends:PATH] sections are bumped after the
+projects they depend on, with a patch bump if they weren't selected
+themselves, and their pins updated to the new versions.
+"""
+
+from __future__ import unicode_literals
+
+import fnmatch
+import os
+import sys
+
+from bumpversion.config import CONFIG_CACHE_DIRECTORY, CONFIG_FILE, load_config
+
+# part bumped in projects bumped only because a dependency was
+DEPENDENT_PART = 'patch'
+
+DEFAULT_EXCLUDE = ['.git', '.hg', '.svn', '.tox', 'node_modules', CONFIG_CACHE_DIRECTORY]
+
+
+def _excluded(relative_path, exclude):
+    name = os.path.basename(relative_path)
+    relative_path = relative_path.replace(os.sep, '/')
+    return any(fnmatch.fnmatch(name, pattern) or fnmatch.fnmatch(relative_path, pattern)
+               for pattern in exclude)
+
+
+def _entries(path):
+    """
+    Yield (name, is a directory, is a file) for the entries of path, not
+    following symbolic links to directories.
+    """
+    if hasattr(os, 'scandir'):
+        for entry in os.scandir(path):
+            yield entry.name, entry.is_dir(follow_symlinks=False), entry.is_file()
+    else:
+        # Python < 3.5
+        for name in os.listdir(path):
+            entry_path = os.path.join(path, name)
+            yield name, os.path.isdir(entry_path) and not os.path.islink(entry_path), os.path.isfile(entry_path)
+
+
+def find_projects(root, exclude=DEFAULT_EXCLUDE):
+    """
+    Yield the directories below root (relative to it, in sorted depth-first
+    order) that contain a .bumpversion.cfg, skipping directories whose name or
+    relative path matches a glob pattern in exclude.
+    """
+    pending = ['']
+    while pending:
+        relative = pending.pop()
+        directories = []
+        has_config = False
+
+        for name, is_dir, is_file in _entries(os.path.join(root, relative)):
+            if is_dir:
+                path = os.path.join(relative, name)
+                if not _excluded(path, exclude):
+                    directories.append(path)
+            elif name == CONFIG_FILE and is_file:
+                has_config = True
+
+        if has_config:
+            yield relative or os.curdir
+
+        pending.extend(sorted(directories, reverse=True))
+
+
+def read_dependencies(root, projects):
+    """
+    Map every project to the projects it depends on, from the
+    [bumpversion:depends:PATH] sections of its .bumpversion.cfg.
+
+    Raises ValueError for a PATH that isn't one of projects.
+    """
+    import io
+
+    known = set(projects)
+    dependencies = {}
+    for project in projects:
+        with io.open(os.path.join(root, project, CONFIG_FILE), 'r', encoding='utf-8') as f:
+            # the cache the project's own bump uses, not one in the current directory
+            config = load_config(f.read(), os.path.join(root, project, CONFIG_CACHE_DIRECTORY))[0]
+
+        dependencies[project] = set()
+        for path, _ in config.depends:
+            dependency = os.path.normpath(os.path.join(project, path))
+            if dependency not in known:
+                raise ValueError("{} depends on {}, which is not a project".format(project, path))
+            dependencies[project].add(dependency)
+
+    return dependencies
+
+
+def schedule(projects, dependencies, selected):
+    """
+    The projects to bump, as a list of levels: the selected projects and all
+    projects depending on them, directly or not. Every project comes in a
+    level after the levels of its dependencies; within a level, projects
+    keep their order in projects.
+
+    Raises ValueError if the projects to bump depend on each other in a cycle.
+    """
+    dependents = dict((project, set()) for project in projects)
+    for project in projects:
+        for dependency in dependencies.get(project, ()):
+            dependents[dependency].add(project)
+
+    to_bump = set()
+    pending = list(selected)
+    while pending:
+        project = pending.pop()
+        if project not in to_bump:
+            to_bump.add(project)
+            pending.extend(dependents[project])
+
+    waiting_for = dict((project, set(dependencies.get(project, ())) & to_bump) for project in to_bump)
+    levels = []
+    while waiting_for:
+        level = [project for project in projects if project in waiting_for and not waiting_for[project]]
+        if not level:
+            raise ValueError("Dependency cycle between {}".format(", ".join(sorted(waiting_for))))
+        levels.append(level)
+        for project in level:
+            del waiting_for[project]
+        for dependencies_left in waiting_for.values():
+            dependencies_left.difference_update(level)
+
+    return levels
+
+
+def _bump_project(task):
+    import bumpversion
+    from bumpversion.daemon import capture
+
+    root, project, args, dependency_versions = task
+    return (project,) + capture(os.path.join(root, project), bumpversion.bump, args, dependency_versions)
+
+
+def bump_projects(root, tasks, processes=1):
+    """
+    Bump projects on up to `processes` worker processes, for tasks of
+    (project, args, dependency versions). Yields (project, status, stdout,
+    stderr, (current version, new version)) in the order of tasks.
+    """
+    tasks = [(root, project, list(args), dependency_versions) for project, args, dependency_versions in tasks]
+
+    if processes <= 1 or len(tasks) <= 1:
+        for task in tasks:
+            yield _bump_project(task)
+        return
+
+    import multiprocessing
+
+    pool = multiprocessing.Pool(min(processes, len(tasks)))
+    try:
+        for result in pool.imap(_bump_project, tasks):
+            yield result
+    finally:
+        pool.close()
+        pool.join()
+
+
+def _prefixed(project, text):
+    return "".join("[{}] {}\n".format(project, line) for line in text.splitlines())
+
+
+def monorepo_main(args):
+    """
+    bumpversion --monorepo [--exclude PATTERN] [--only PATH] [--processes N] <bumpversion arguments>
+    """
+    import argparse
+
+    from bumpversion import DESCRIPTION, default_jobs, split_args_in_optional_and_positional
+
+    parser = argparse.ArgumentParser(prog='bumpversion --monorepo', description=DESCRIPTION)
+    parser.add_argument('--monorepo', action='store_true', required=True,
+                        help='Bump every project below the current directory')
+    parser.add_argument('--exclude', metavar='PATTERN', action='append', default=[],
+                        help='Skip directories matching this glob pattern (repeatable)')
+    parser.add_argument('--only', metavar='PATH', action='append', default=[],
+                        help='Only bump this project, and the projects depending on it (repeatable)')
+    parser.add_argument('--processes', metavar='N', type=int, default=default_jobs(),
+                        help='Number of projects to bump in parallel')
+    options, bump_args = parser.parse_known_args(args)
+
+    root = os.getcwd()
+    projects = list(find_projects(root, DEFAULT_EXCLUDE + options.exclude))
+    if not projects:
+        sys.stderr.write("Could not find any {} file\n".format(CONFIG_FILE))
+        sys.exit(2)
+
+    selected = [os.path.normpath(path) for path in options.only] or projects
+    try:
+        unknown = [path for path in selected if path not in projects]
+        if unknown:
+            raise ValueError("Not a project: {}".format(", ".join(unknown)))
+        dependencies = read_dependencies(root, projects)
+        levels = schedule(projects, dependencies, selected)
+    except ValueError as e:
+        sys.stderr.write("{}\n".format(e))
+        sys.exit(2)
+
+    positionals, optionals = split_args_in_optional_and_positional(bump_args)
+    dependent_args = optionals + [DEPENDENT_PART] + positionals[1:]
+
+    versions = {}
+    failed = []
+    bumped = 0
+    for level in levels:
+        tasks = []
+        for project in level:
+            failed_dependencies = [dependency for dependency in dependencies[project] if dependency in failed]
+            if failed_dependencies:
+                failed.append(project)
+                sys.stderr.write("[{}] skipped, depends on failed {}\n".format(project, ", ".join(failed_dependencies)))
+                continue
+            dependency_versions = dict(
+                (os.path.abspath(os.path.join(root, dependency)), versions[dependency])
+                for dependency in dependencies[project] if dependency in versions)
+            tasks.append((project, bump_args if project in selected else dependent_args, dependency_versions))
+
+        for project, status, stdout, stderr, project_versions in bump_projects(root, tasks, options.processes):
+            sys.stdout.write(_prefixed(project, stdout))
+            sys.stderr.write(_prefixed(project, stderr))
+            if status:
+                failed.append(project)
+                sys.stderr.write("[{}] failed with exit status {}\n".format(project, status))
+            else:
+                bumped += 1
+                versions[project] = project_versions
+
+    sys.stderr.write("Bumped {} of {} projects".format(bumped, bumped + len(failed)))
+    sys.stderr.write(", failed: {}\n".format(", ".join(failed)) if failed else "\n")
+
+    if failed:
+        sys.exit(1)
@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+"""
+Writing the files of a bump as a unit.
+
+Before the first file is written, the original content of every file is
+backed up next to a journal of their paths and hashes. The journal is
+removed once every file is written, so finding one means a bump was
+interrupted: recover() then puts back the original content of the files
+it had written.
+"""
+
+from __future__ import unicode_literals
+
+import io
+import json
+import logging
+import os
+import shutil
+
+from bumpversion.config import JOURNAL_DIRECTORY
+
+JOURNAL_FILE = 'journal.json'
+
+logger = logging.getLogger("bumpversion.logger")
+
+
+def _sha1(content):
+    import hashlib
+
+    return hashlib.sha1(content.encode('utf-8')).hexdigest()
+
+
+def _read(path):
+    with io.open(path, 'rb') as f:
+        return f.read().decode('utf-8')
+
+
+class Transaction(object):
+    """
+    Collects the new content of files with add(), and writes all of them
+    with commit(), rolling back the ones already written if one fails.
+
+    :param write: function(path, content) writing a file atomically
+    """
+
+    def __init__(self, write, directory=JOURNAL_DIRECTORY, fsync=False):
+        self._write = write
+        self.directory = directory
+        self.fsync = fsync
+        self.changes = []
+
+    def add(self, path, content_before, content_after):
+        self.changes.append((path, content_before, content_after))
+
+    def _write_journal(self):
+        from bumpversion import atomic_write
+
+        if os.path.exists(self.directory):
+            shutil.rmtree(self.directory)
+        os.makedirs(self.directory)
+
+        entries = []
+        for index, (path, content_before, content_after) in enumerate(self.changes):
+            backup = '{}.orig'.format(index)
+            atomic_write(os.path.join(self.directory, backup), content_before.encode('utf-8'), self.fsync)
+            entries.append({
+                'path': path,
+                'backup': backup,
+                'before': _sha1(content_before),
+                'after': _sha1(content_after),
+            })
+
+        # written last: the journal is only valid once every backup is
+        atomic_write(os.path.join(self.directory, JOURNAL_FILE),
+                     json.dumps({'files': entries}).encode('utf-8'), self.fsync)
+
+    def commit(self):
+        """
+        Write all added files, or none of them.
+        """
+        if not self.changes:
+            return
+
+        self._write_journal()
+        try:
+            for path, _, content_after in self.changes:
+                self._write(path, content_after)
+        except BaseException:
+            restored = rollback(self.directory, self.fsync)
+            logger.error("Rolled back the changes to %s", ", ".join(restored) or "no files")
+            raise
+
+        # the commit point
+        os.remove(os.path.join(self.directory, JOURNAL_FILE))
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+
+def rollback(directory=JOURNAL_DIRECTORY, fsync=False):
+    """
+    Restore the original content of every file in the journal in directory
+    that has the content the bump was writing, and remove the journal.
+
+    :return: the paths of the restored files
+    """
+    from bumpversion import atomic_write
+
+    journal_path = os.path.join(directory, JOURNAL_FILE)
+    if not os.path.exists(journal_path):
+        shutil.rmtree(directory, ignore_errors=True)
+        return []
+
+    with io.open(journal_path, 'r', encoding='utf-8') as f:
+        entries = json.load(f)['files']
+
+    restored = []
+    for entry in entries:
+        try:
+            current = _sha1(_read(entry['path']))
+        except (IOError, OSError, UnicodeDecodeError):
+            current = None
+        if current == entry['before']:
+            continue
+        if current != entry['after']:
+            # not what the bump wrote either, so leave it alone
+            logger.warning("Not restoring %s, it changed since the bump", entry['path'])
+            continue
+        with io.open(os.path.join(directory, entry['backup']), 'rb') as f:
+            atomic_write(entry['path'], f.read(), fsync)
+        restored.append(entry['path'])
+
+    os.remove(journal_path)
+    shutil.rmtree(directory, ignore_errors=True)
+    return restored
+
+
+def recover(directory=JOURNAL_DIRECTORY):
+    """
+    Roll back a bump that was interrupted before it committed, if any.
+
+    :return: the paths of the restored files
+    """
+    if not os.path.exists(directory):
+        return []
+
+    restored = rollback(directory)
+    logger.warning("Rolled back an interrupted bump, restored: %s", ", ".join(restored) or "no files")
+    return restored
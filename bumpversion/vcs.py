@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+"""
+Committing and tagging a bump in Git, with as few git processes as possible:
+
+- one ``git status --porcelain -z`` of the bumped files, for the dirty
+  check and to tell tracked files from the others,
+- one ``git commit --only`` adding and committing the bumped files, and
+  nothing else that is staged,
+- one ``git tag``.
+
+Every git process goes through Git.run(), which counts them in ``spawns``.
+"""
+
+from __future__ import unicode_literals
+
+import os
+import subprocess
+
+
+def find_toplevel(path):
+    """
+    The top-level directory of the Git working tree path is in, found
+    without running git, or None.
+    """
+    path = os.path.abspath(path)
+    while True:
+        if os.path.exists(os.path.join(path, '.git')):
+            return path
+        parent = os.path.dirname(path)
+        if parent == path:
+            return None
+        path = parent
+
+
+class GitStatus(object):
+    """
+    What `git status` says about the bumped files: the tracked ones with
+    changes (dirty), and the untracked or ignored ones (untracked), as
+    absolute paths.
+    """
+
+    def __init__(self, dirty, untracked):
+        self.dirty = dirty
+        self.untracked = untracked
+
+    @classmethod
+    def parse(cls, output, toplevel):
+        """
+        Parse `git status --porcelain -z --untracked-files=all --ignored`,
+        whose paths are relative to toplevel.
+        """
+        dirty = []
+        untracked = []
+        entries = iter(output.split('\0'))
+        for entry in entries:
+            if not entry:
+                continue
+            status, path = entry[:2], os.path.normpath(os.path.join(toplevel, entry[3:]))
+            if status in ('??', '!!'):
+                untracked.append(path)
+            else:
+                dirty.append(path)
+            if status[0] in 'RC':
+                # followed by the path it was renamed or copied from
+                next(entries, None)
+        return cls(dirty, untracked)
+
+
+class Git(object):
+
+    def __init__(self):
+        self.spawns = 0
+
+    def run(self, args, input=None):
+        """
+        Run git with args, returning its output. Raises
+        subprocess.CalledProcessError if it fails, and OSError if there is no
+        git at all.
+        """
+        self.spawns += 1
+        process = subprocess.Popen(
+            ['git'] + list(args),
+            stdin=subprocess.PIPE if input is not None else None,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+        )
+        stdout, stderr = process.communicate(None if input is None else input.encode('utf-8'))
+        if process.returncode:
+            raise subprocess.CalledProcessError(
+                process.returncode, ['git'] + list(args), stdout + stderr)
+        return stdout.decode('utf-8')
+
+    def status(self, paths):
+        output = self.run(['status', '--porcelain', '-z', '--untracked-files=all', '--ignored', '--'] + list(paths))
+        return GitStatus.parse(output, find_toplevel(os.getcwd()) or os.getcwd())
+
+    def commit(self, message, paths):
+        """
+        Commit the current content of paths, which must be tracked, and
+        nothing else, with message.
+        """
+        self.run(['commit', '--only', '--file', '-', '--'] + list(paths), input=message)
+
+    def tag(self, name):
+        self.run(['tag', name])
+
+    def describe(self):
+        """
+        The latest v* tag, as (tag, distance to it, commit sha, dirty).
+        """
+        description = self.run(
+            ['describe', '--dirty', '--tags', '--long', '--abbrev=40', '--match=v*']).strip()
+        dirty = description.endswith('-dirty')
+        if dirty:
+            description = description[:-len('-dirty')]
+        tag, distance, commit_sha = description.rsplit('-', 2)
+        return tag, int(distance), commit_sha[1:], dirty
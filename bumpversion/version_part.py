@@ -18,6 +18,9 @@ class PartConfiguration(object):
     def bump(self, value=None):
         return self.function.bump(value)
 
+    def sort_key(self, value):
+        return self.function.sort_key(value)
+
 
 class ConfiguredVersionPartConfiguration(PartConfiguration):
     function_cls = ValuesFunction
@@ -27,17 +30,26 @@ class NumericVersionPartConfiguration(PartConfiguration):
     function_cls = NumericFunction
 
 
+# configuration of parts without a [bumpversion:part:...] section, shared by all of them
+DEFAULT_PART_CONFIGURATION = NumericVersionPartConfiguration()
+
+
 class VersionPart(object):
     """
     This class represents part of a version number. It contains a self.config
     object that rules how the part behaves when increased or reset.
+
+    Parts are immutable; bumping or nulling returns a new part.
     """
 
+    __slots__ = ('_value', 'config', '_sort_key')
+
     def __init__(self, value, config=None):
         self._value = value
+        self._sort_key = None
 
         if config is None:
-            config = NumericVersionPartConfiguration()
+            config = DEFAULT_PART_CONFIGURATION
 
         self.config = config
 
@@ -46,7 +58,7 @@ class VersionPart(object):
         return self._value or self.config.optional_value
 
     def copy(self):
-        return VersionPart(self._value)
+        return VersionPart(self._value, self.config)
 
     def bump(self):
         return VersionPart(self.config.bump(self.value), self.config)
@@ -54,6 +66,11 @@ class VersionPart(object):
     def is_optional(self):
         return self.value == self.config.optional_value
 
+    def sort_key(self):
+        if self._sort_key is None:
+            self._sort_key = self.config.sort_key(self.value)
+        return self._sort_key
+
     def __format__(self, format_spec):
         return self.value
 
@@ -66,5 +83,11 @@ class VersionPart(object):
     def __eq__(self, other):
         return self.value == other.value
 
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    def __hash__(self):
+        return hash(self.value)
+
     def null(self):
         return VersionPart(self.config.first_value, self.config)
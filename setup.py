@@ -22,6 +22,7 @@ setup(
     entry_points={
         'console_scripts': [
             'bumpversion = bumpversion:main',
+            'bumpversion-client = bumpversion.daemon:client_main',
         ]
     },
     classifiers=(
@@ -0,0 +1,35 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import unicode_literals
+
+import pytest
+
+import bumpversion
+
+
+@pytest.fixture
+def version_config():
+    """
+    major.minor.patch versions.
+    """
+    return bumpversion.VersionConfig(
+        parse=r'(?P<major>\d+)\.(?P<minor>\d+)\.(?P<patch>\d+)',
+        serialize=['{major}.{minor}.{patch}'],
+        search='{current_version}',
+        replace='{new_version}',
+    )
+
+
+@pytest.fixture
+def release_version_config():
+    """
+    major.minor.patch versions with an optional -dev or -gamma release.
+    """
+    return bumpversion.VersionConfig(
+        parse=r'(?P<major>\d+)\.(?P<minor>\d+)\.(?P<patch>\d+)(\-(?P<release>[a-z]+))?',
+        serialize=['{major}.{minor}.{patch}-{release}', '{major}.{minor}.{patch}', '{major}.{minor}'],
+        search='{current_version}',
+        replace='{new_version}',
+        part_configs={'release': bumpversion.ConfiguredVersionPartConfiguration(
+            ['dev', 'gamma'], optional_value='gamma')},
+    )
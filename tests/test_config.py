@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import unicode_literals
+
+import os
+
+import pytest
+
+import bumpversion.config
+from bumpversion import main
+from bumpversion.config import load_config, resolve_config
+
+CONFIG = """[bumpversion]
+current_version = 1.2.3-dev
+new_version = 1.2.4
+parse = (?P<major>\\d+)\\.(?P<minor>\\d+)\\.(?P<patch>\\d+)(\\-(?P<release>[a-z]+))?
+serialize =
+  {major}.{minor}.{patch}-{release}
+  {major}.{minor}.{patch}
+config_cache = True
+
+[bumpversion:part:release]
+optional_value = gamma
+values =
+  dev
+  gamma
+
+[bumpversion:file:VERSION]
+search = version={current_version}
+"""
+
+
+def test_resolve_config_fills_in_file_defaults():
+    config = resolve_config(CONFIG)
+
+    assert config.defaults['serialize'] == ['{major}.{minor}.{patch}-{release}', '{major}.{minor}.{patch}']
+    assert config.defaults['config_cache'] is True
+    assert config.parts == [('release', {'optional_value': 'gamma', 'values': ['dev', 'gamma']})]
+
+    [(path, options)] = config.files
+    assert path == 'VERSION'
+    assert options['search'] == 'version={current_version}'
+    assert options['replace'] == '{new_version}'
+    assert options['serialize'] == config.defaults['serialize']
+
+
+def test_bumped_config_matches_parsing_the_written_config():
+    config = resolve_config(CONFIG)
+    written = config.write('1.2.4')
+
+    assert 'current_version = 1.2.4\n' in written
+    assert 'new_version' not in written
+    assert config.bumped('1.2.4').as_dict() == resolve_config(written).as_dict()
+
+
+@pytest.fixture
+def forget_resolved_configs():
+    bumpversion.config._resolved_configs.clear()
+    yield
+    bumpversion.config._resolved_configs.clear()
+
+
+def test_load_config_remembers_resolved_configs(tmpdir, forget_resolved_configs):
+    disabled = CONFIG.replace('config_cache = True', '')
+    cache_directory = str(tmpdir.join('cache'))
+
+    assert load_config(disabled, cache_directory)[1] is False
+    assert load_config(disabled, cache_directory)[1] is True
+    assert not os.path.exists(cache_directory)
+
+
+def test_load_config_caches_on_disk_only_when_enabled(tmpdir, forget_resolved_configs):
+    cache_directory = str(tmpdir.join('cache'))
+
+    assert load_config(CONFIG, cache_directory)[1] is False
+    bumpversion.config._resolved_configs.clear()
+    config, from_cache = load_config(CONFIG, cache_directory)
+    assert from_cache is True
+    assert config.as_dict() == resolve_config(CONFIG).as_dict()
+
+    # another content misses, and replaces the old entry
+    changed = CONFIG.replace('1.2.3-dev', '1.2.3')
+    assert load_config(changed, cache_directory)[1] is False
+    assert len(os.listdir(cache_directory)) == 1
+
+    disabled = CONFIG.replace('config_cache = True', '')
+    load_config(disabled, cache_directory)
+    bumpversion.config._resolved_configs.clear()
+    assert load_config(disabled, cache_directory)[1] is False
+
+
+def test_bumps_through_the_config_cache(tmpdir, forget_resolved_configs):
+    tmpdir.chdir()
+    tmpdir.join('.bumpversion.cfg').write(CONFIG.replace('new_version = 1.2.4\n', ''))
+    tmpdir.join('VERSION').write("version=1.2.3-dev\n")
+
+    main(['release'])
+    assert tmpdir.join('VERSION').read() == "version=1.2.3\n"
+
+    cached = os.listdir(str(tmpdir.join('.bumpversion.cache')))
+    assert len(cached) == 1
+    bumpversion.config._resolved_configs.clear()
+    assert load_config(tmpdir.join('.bumpversion.cfg').read())[1] is True
+
+    main(['patch'])
+    assert tmpdir.join('VERSION').read() == "version=1.2.4-dev\n"
+    assert 'current_version = 1.2.4-dev' in tmpdir.join('.bumpversion.cfg').read()
+    assert os.listdir(str(tmpdir.join('.bumpversion.cache'))) != cached
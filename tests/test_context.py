@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import unicode_literals
+
+import pytest
+
+from bumpversion.context import EnvironmentContext, LayeredContext, TimeContext, format_map
+
+
+def test_environment_context_looks_up_prefixed_keys():
+    context = EnvironmentContext({'BUILD': '42'})
+    assert context['$BUILD'] == '42'
+    assert '$BUILD' in context
+    assert 'BUILD' not in context
+    assert list(context) == ['$BUILD']
+    with pytest.raises(KeyError):
+        context['BUILD']
+
+
+def test_time_context_reads_the_clock_once_on_first_use(monkeypatch):
+    import bumpversion.context
+
+    calls = []
+
+    class _Clock(object):
+        @staticmethod
+        def now():
+            calls.append('now')
+            return 'local'
+
+        @staticmethod
+        def utcnow():
+            calls.append('utcnow')
+            return 'utc'
+
+    monkeypatch.setattr(bumpversion.context, 'datetime', _Clock)
+    context = TimeContext()
+    assert 'now' in context
+    assert calls == []
+
+    assert format_map('{now}/{utcnow}/{now}', context) == 'local/utc/local'
+    assert calls == ['now', 'utcnow']
+
+
+def test_time_context_reads_the_clock_once_across_threads(monkeypatch):
+    import threading
+    import time
+
+    import bumpversion.context
+
+    calls = []
+
+    class _SlowClock(object):
+        @staticmethod
+        def now():
+            calls.append('now')
+            time.sleep(0.01)
+            return len(calls)
+
+        utcnow = now
+
+    monkeypatch.setattr(bumpversion.context, 'datetime', _SlowClock)
+    context = TimeContext()
+    seen = []
+    threads = [threading.Thread(target=lambda: seen.append(context['now'])) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert calls == ['now', 'now']
+    assert seen == [1] * 8
+
+
+def test_layered_context_reads_through_and_writes_to_own_layer():
+    base = {'a': 1, 'b': 2}
+    context = LayeredContext({'a': 10}, base)
+    context['b'] = 20
+
+    assert (context['a'], context['b']) == (10, 20)
+    assert base == {'a': 1, 'b': 2}
+    assert sorted(context) == ['a', 'b']
+    assert len(context) == 2
+    assert 'c' not in context
+    with pytest.raises(KeyError):
+        context['c']
+
+
+class _CountingLayer(object):
+    def __init__(self):
+        self.lookups = []
+
+    def __getitem__(self, key):
+        self.lookups.append(key)
+        raise KeyError(key)
+
+    def __contains__(self, key):
+        return False
+
+
+def test_format_map_only_looks_up_used_keys():
+    layer = _CountingLayer()
+    context = LayeredContext({'new_version': '1.2.4'}, layer)
+    assert format_map('{new_version}-{$BUILD}', LayeredContext({'$BUILD': '7'}, context)) == '1.2.4-7'
+    assert layer.lookups == []
+
+    with pytest.raises(KeyError):
+        format_map('{missing}', context)
+    assert layer.lookups == ['missing']
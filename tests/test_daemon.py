@@ -0,0 +1,148 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import unicode_literals
+
+import os
+import shutil
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import pytest
+
+from bumpversion import daemon
+
+needs_unix_sockets = pytest.mark.skipif(not daemon.HAS_UNIX_SOCKETS, reason="needs Unix sockets")
+
+
+@pytest.fixture
+def socket_path():
+    # short enough for the Unix socket path limit
+    directory = tempfile.mkdtemp()
+    yield os.path.join(directory, 'bumpversion.sock')
+    shutil.rmtree(directory)
+
+
+@pytest.fixture
+def server(socket_path):
+    server = daemon.make_server(socket_path)
+    thread = threading.Thread(target=server.serve_forever)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+    thread.join()
+
+
+def _project(tmpdir):
+    tmpdir.join('.bumpversion.cfg').write("[bumpversion]\ncurrent_version = 1.2.3\n\n[bumpversion:file:VERSION]\n")
+    tmpdir.join('VERSION').write("1.2.3\n")
+
+
+@needs_unix_sockets
+def test_daemon_runs_requests_in_their_directory(tmpdir, server, socket_path):
+    _project(tmpdir)
+
+    status, stdout, stderr = daemon.request(['--list', '--dry-run', 'patch'], str(tmpdir), socket_path)
+    assert status == 0
+    assert 'new_version=1.2.4' in stdout.splitlines()
+    assert tmpdir.join('VERSION').read() == "1.2.3\n"
+
+    status, stdout, stderr = daemon.request(['patch'], str(tmpdir), socket_path)
+    assert (status, stdout) == (0, "")
+    assert tmpdir.join('VERSION').read() == "1.2.4\n"
+    assert 'current_version = 1.2.4' in tmpdir.join('.bumpversion.cfg').read()
+
+
+@needs_unix_sockets
+def test_daemon_reports_failures(tmpdir, server, socket_path):
+    status, stdout, stderr = daemon.request(['patch'], str(tmpdir), socket_path)
+    assert status == 2
+    assert "Could not read any of" in stderr
+
+
+def test_client_falls_back_to_running_in_process(tmpdir, socket_path, monkeypatch):
+    _project(tmpdir)
+    tmpdir.chdir()
+    monkeypatch.setenv('BUMPVERSION_SOCKET', socket_path)
+
+    daemon.client_main(['minor'])
+    assert tmpdir.join('VERSION').read() == "1.3.0\n"
+
+
+def test_client_runs_in_process_without_unix_sockets(tmpdir, monkeypatch):
+    _project(tmpdir)
+    tmpdir.chdir()
+    monkeypatch.setattr(daemon, 'HAS_UNIX_SOCKETS', False)
+    monkeypatch.setattr(daemon, 'request', None)
+
+    daemon.client_main(['minor'])
+    assert tmpdir.join('VERSION').read() == "1.3.0\n"
+
+
+@needs_unix_sockets
+def test_client_falls_back_on_a_truncated_response(tmpdir, socket_path, monkeypatch):
+    _project(tmpdir)
+    tmpdir.chdir()
+    monkeypatch.setenv('BUMPVERSION_SOCKET', socket_path)
+    listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    listener.bind(socket_path)
+    listener.listen(1)
+
+    def hang_up():
+        connection, _ = listener.accept()
+        connection.recv(4096)
+        connection.sendall(b'{"status": 0, "std')
+        connection.close()
+
+    thread = threading.Thread(target=hang_up)
+    thread.start()
+    try:
+        daemon.client_main(['minor'])
+    finally:
+        thread.join()
+        listener.close()
+    assert tmpdir.join('VERSION').read() == "1.3.0\n"
+
+
+@needs_unix_sockets
+def test_client_prints_the_daemon_response(tmpdir, server, socket_path, monkeypatch, capsys):
+    _project(tmpdir)
+    tmpdir.chdir()
+    monkeypatch.setenv('BUMPVERSION_SOCKET', socket_path)
+
+    daemon.client_main(['--list', 'major'])
+    assert 'new_version=2.0.0' in capsys.readouterr().out.splitlines()
+    assert tmpdir.join('VERSION').read() == "2.0.0\n"
+
+
+@needs_unix_sockets
+def test_socket_is_private(server, socket_path):
+    assert os.stat(socket_path).st_mode & 0o777 == 0o600
+
+
+@needs_unix_sockets
+def test_served_requests_print_like_bumpversion(tmpdir, socket_path):
+    _project(tmpdir)
+    process = subprocess.Popen(
+        [sys.executable, '-c', "from bumpversion import main; main(['--serve', '--socket', {!r}])".format(socket_path)],
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        stderr=subprocess.PIPE,
+    )
+    try:
+        while not os.path.exists(socket_path):
+            assert process.poll() is None, process.stderr.read()
+            time.sleep(0.01)
+
+        assert daemon.request(['--dry-run', 'patch'], str(tmpdir), socket_path) == (0, "", "")
+        status, stdout, stderr = daemon.request(['--list', '--dry-run', 'patch'], str(tmpdir), socket_path)
+        assert 'new_version=1.2.4' in stdout.splitlines()
+    finally:
+        process.send_signal(signal.SIGINT)
+        _, stderr = process.communicate()
+
+    assert stderr.decode('utf-8') == "Serving on {}\n".format(socket_path)
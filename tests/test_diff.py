@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import unicode_literals
+
+from difflib import unified_diff
+
+import pytest
+
+import bumpversion.diff
+from bumpversion import main
+from bumpversion.diff import replacement_diff
+
+
+def _difflib_diff(text, search, replacement):
+    return list(unified_diff(
+        text.splitlines(),
+        text.replace(search, replacement).splitlines(),
+        lineterm="",
+        fromfile="a/file",
+        tofile="b/file",
+    ))
+
+
+@pytest.mark.parametrize("text,search,replacement", [
+    ("version='1.2.3'\n", "1.2.3", "1.2.4"),
+    ("no version here\n", "1.2.3", "1.2.4"),
+    ("".join("line {}\n".format(i) for i in range(40)) + "1.2.3\n" + "tail\n" * 40 + "1.2.3", "1.2.3", "1.2.4"),
+    ("a\n1.2.3\nb\n1.2.3\nc\n", "1.2.3", "1.2.4"),
+    ("version = 1.2.3\nrelease = 1.2.3\n", "1.2.3", "1.2.4"),
+    ("a = 1.2.3\nb = 1.2.3\nc = 1.2.3\nd\ne = 1.2.3\n", "1.2.3", "1.2.4"),
+    ("Changes\n=======\n\n**unreleased**\n\n- fix\n", "**unreleased**", "**unreleased**\n**v1.2.4**"),
+    ("x = 1.2.3\ny = 2\n", "1.2.3\ny", "1.2.4\nz"),
+    ("1.2.3\nkeep\n", "1.2.3\n", ""),
+    ("windows\r\n1.2.3\r\n", "1.2.3", "1.2.4"),
+])
+def test_replacement_diff_matches_difflib(text, search, replacement):
+    assert list(replacement_diff(text, search, replacement, "a/file", "b/file")) == \
+        _difflib_diff(text, search, replacement)
+
+
+def test_diff_is_only_built_when_logged(tmpdir, monkeypatch):
+    tmpdir.chdir()
+    tmpdir.join('.bumpversion.cfg').write("""[bumpversion]
+current_version = 0.10.4
+""")
+    tmpdir.join('setup.py').write("setup(version='0.10.4')\n")
+
+    def fail(*args, **kwargs):
+        raise AssertionError("diff should not be built")
+
+    monkeypatch.setattr(bumpversion.diff, 'replacement_diff', fail)
+    main(['patch'])
+
+    assert tmpdir.join('setup.py').read() == "setup(version='0.10.5')\n"
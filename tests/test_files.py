@@ -0,0 +1,225 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import unicode_literals
+
+import os
+
+import pytest
+
+import bumpversion
+from bumpversion import main
+
+
+def test_find_returns_first_match(tmpdir, version_config):
+    tmpdir.join('VERSION').write("""# header
+version='1.2.3'
+version='4.5.6'
+""")
+    vc = version_config
+    version, zero_patch_version = bumpversion.ConfiguredFile(str(tmpdir.join('VERSION')), vc).find('minor')
+    assert [version[k].value for k in ('major', 'minor', 'patch')] == ['1', '2', '3']
+    assert zero_patch_version['minor'].value == '0'
+
+
+@pytest.mark.parametrize("search,expected", [
+    ("1.2.3", True),
+    ("version='1.2.3'\nurl='https", True),
+    ("**unreleased**\n\nv1.2.3\n---", True),
+    ("**unreleased**\n\nv1.2.3\nother", False),
+    ("**unreleased**\nv1.2.3\n---", False),
+    ("1.2.4", False),
+])
+def test_contains_multiline_search(tmpdir, search, expected, version_config):
+    tmpdir.join('CHANGES').write("""version='1.2.3'
+url='https://github.com/peritus/bumpversion'
+
+**unreleased**
+
+v1.2.3
+------
+""")
+    vc = version_config
+    assert bumpversion.ConfiguredFile(str(tmpdir.join('CHANGES')), vc).contains(search) is expected
+
+
+def test_content_cache_reads_each_file_once(tmpdir):
+    version_file = tmpdir.join('VERSION')
+    version_file.write("version='1.2.3'\n")
+    cache = bumpversion.ContentCache()
+
+    assert cache.read(str(version_file)) == "version='1.2.3'\n"
+    assert cache.read(str(version_file)) == "version='1.2.3'\n"
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    version_file.write("version='1.2.40'\n")
+    assert cache.read(str(version_file)) == "version='1.2.40'\n"
+    assert (cache.hits, cache.misses) == (1, 2)
+
+
+def test_content_cache_caches_lines_streamed_to_the_end(tmpdir):
+    version_file = tmpdir.join('VERSION')
+    version_file.write("# header\nversion='1.2.3'\n")
+    cache = bumpversion.ContentCache()
+
+    assert list(cache.iter_lines(str(version_file))) == ["# header", "version='1.2.3'"]
+    assert (cache.hits, cache.misses) == (0, 1)
+    assert cache.read(str(version_file)) == "# header\nversion='1.2.3'\n"
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_content_cache_counts_streams_stopped_early(tmpdir):
+    version_file = tmpdir.join('VERSION')
+    version_file.write("# header\nversion='1.2.3'\n")
+    cache = bumpversion.ContentCache()
+
+    assert next(iter(cache.iter_lines(str(version_file)))) == "# header"
+    assert cache.get(str(version_file)) is None
+    assert cache.read(str(version_file)) == "# header\nversion='1.2.3'\n"
+    assert (cache.hits, cache.misses) == (0, 2)
+
+
+def test_content_cache_shared_by_configured_file_methods(tmpdir, version_config):
+    tmpdir.join('VERSION').write("version='1.2.3'\n")
+    vc = version_config
+    cache = bumpversion.ContentCache()
+    configured_file = bumpversion.ConfiguredFile(str(tmpdir.join('VERSION')), vc, cache)
+
+    assert configured_file.contains('1.2.3')
+    current_version, _ = configured_file.find()
+    configured_file.replace(current_version, current_version.bump('patch', vc.order()), {}, False)
+
+    assert tmpdir.join('VERSION').read() == "version='1.2.4'\n"
+    assert (cache.hits, cache.misses) == (2, 1)
+
+
+def test_file_sections_are_updated(tmpdir):
+    tmpdir.chdir()
+    tmpdir.join('.bumpversion.cfg').write("""[bumpversion]
+current_version: 0.10.4
+
+[bumpversion:file:VERSION.txt]
+
+[bumpversion:file:CHANGES.rst]
+search = **unreleased**
+replace = **v{new_version}**
+""")
+    tmpdir.join('setup.py').write("setup(version='0.10.4')\n")
+    tmpdir.join('VERSION.txt').write("0.10.4\n")
+    tmpdir.join('CHANGES.rst').write("**unreleased**\n")
+    tmpdir.join('README.rst').write("0.10.4\n")
+
+    main(['patch', 'README.rst', '--jobs', '2'])
+
+    assert tmpdir.join('setup.py').read() == "setup(version='0.10.5')\n"
+    assert tmpdir.join('VERSION.txt').read() == "0.10.5\n"
+    assert tmpdir.join('CHANGES.rst').read() == "**v0.10.5**\n"
+    assert tmpdir.join('README.rst').read() == "0.10.5\n"
+    assert '0.10.5' in tmpdir.join('.bumpversion.cfg').read()
+
+
+def test_failing_file_section_leaves_other_files_untouched(tmpdir):
+    tmpdir.chdir()
+    tmpdir.join('.bumpversion.cfg').write("""[bumpversion]
+current_version: 0.10.4
+
+[bumpversion:file:VERSION.txt]
+
+[bumpversion:file:MISSING.txt]
+""")
+    tmpdir.join('setup.py').write("setup(version='0.10.4')\n")
+    tmpdir.join('VERSION.txt').write("0.10.4\n")
+
+    with pytest.raises(IOError):
+        main(['patch'])
+
+    assert tmpdir.join('setup.py').read() == "setup(version='0.10.4')\n"
+    assert tmpdir.join('VERSION.txt').read() == "0.10.4\n"
+    assert '0.10.4' in tmpdir.join('.bumpversion.cfg').read()
+
+
+def test_unchanged_files_are_not_rewritten(tmpdir):
+    tmpdir.chdir()
+    tmpdir.join('.bumpversion.cfg').write("""[bumpversion]
+current_version = 0.10.4
+
+[bumpversion:file:VERSION.txt]
+""")
+    tmpdir.join('setup.py').write("setup(version='0.10.4')\n")
+    tmpdir.join('VERSION.txt').write("no version in here\n")
+    tmpdir.join('VERSION.txt').setmtime(1000000000)
+
+    main(['patch', '--fsync'])
+
+    assert tmpdir.join('setup.py').read() == "setup(version='0.10.5')\n"
+    assert tmpdir.join('VERSION.txt').mtime() == 1000000000
+    assert not [p for p in tmpdir.listdir() if p.basename.endswith('.tmp')]
+
+
+def test_content_cache_write_is_atomic_and_skips_unchanged(tmpdir):
+    version_file = tmpdir.join('VERSION')
+    version_file.write("1.2.3\n")
+    version_file.chmod(0o640)
+    cache = bumpversion.ContentCache()
+
+    assert cache.write(str(version_file), cache.read(str(version_file))) is False
+    assert cache.write(str(version_file), "1.2.4\n") is True
+
+    assert version_file.read() == "1.2.4\n"
+    assert version_file.stat().mode & 0o777 == 0o640
+    assert (cache.files_written, cache.bytes_written) == (1, 6)
+    assert tmpdir.listdir() == [version_file]
+
+
+@pytest.mark.skipif(not hasattr(os, 'symlink'), reason="needs symlinks")
+def test_atomic_write_replaces_the_target_of_a_symlink(tmpdir):
+    target = tmpdir.join('real', 'VERSION')
+    target.write("1.2.3\n", ensure=True)
+    target.chmod(0o640)
+    link = tmpdir.join('VERSION')
+    link.mksymlinkto(target)
+    stat = target.stat()
+
+    bumpversion.atomic_write(str(link), b"1.2.4\n")
+
+    assert link.islink()
+    assert target.read() == "1.2.4\n"
+    assert (target.stat().mode & 0o777, target.stat().uid, target.stat().gid) == (0o640, stat.uid, stat.gid)
+    assert tmpdir.join('real').listdir() == [target]
+
+
+def test_atomic_write_replaces_an_existing_file(tmpdir):
+    version_file = tmpdir.join('VERSION')
+    version_file.write("1.2.3\n")
+
+    bumpversion.atomic_write(str(version_file), b"1.2.4\n")
+    bumpversion.atomic_write(str(version_file), b"1.2.5\n")
+
+    assert version_file.read() == "1.2.5\n"
+    assert tmpdir.listdir() == [version_file]
+
+
+def test_move_file_replace_existing_calls_move_file_ex(tmpdir, monkeypatch):
+    import ctypes
+
+    calls = []
+
+    class Kernel32(object):
+        def MoveFileExW(self, source, destination, flags):
+            calls.append((source, destination, flags))
+            os.rename(source, destination)
+            return 1
+
+    class WinDLL(object):
+        kernel32 = Kernel32()
+
+    monkeypatch.setattr(ctypes, 'windll', WinDLL(), raising=False)
+    monkeypatch.setattr(bumpversion, '_replace_file', bumpversion._move_file_replace_existing)
+    version_file = tmpdir.join('VERSION')
+    version_file.write("1.2.3\n")
+
+    bumpversion.atomic_write(str(version_file), b"1.2.4\n")
+
+    assert version_file.read() == "1.2.4\n"
+    [(_, destination, flags)] = calls
+    assert (destination, flags) == (str(version_file), 0x1)
+    assert tmpdir.listdir() == [version_file]
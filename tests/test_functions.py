@@ -80,3 +80,33 @@ def test_values_bump():
     func = ValuesFunction([0, 5, 10])
     with pytest.raises(ValueError):
         func.bump(10)
+
+
+def test_numeric_sort_key():
+    func = NumericFunction()
+    assert func.sort_key('r10-001') == 10
+    assert func.sort_key('9') < func.sort_key('10')
+
+
+def test_values_sort_key():
+    func = ValuesFunction(['dev', 'rc', 'gamma'])
+    assert [func.sort_key(v) for v in ['dev', 'rc', 'gamma']] == [0, 1, 2]
+
+
+def test_values_bump_unknown_value():
+    func = ValuesFunction(['dev', 'rc', 'gamma'])
+    with pytest.raises(ValueError) as excinfo:
+        func.bump('beta')
+    assert "'beta'" in str(excinfo.value)
+
+
+def test_values_bump_large_values_list():
+    values = ['train-{}'.format(i) for i in range(5000)]
+    func = ValuesFunction(values, optional_value='train-4999', first_value='train-0')
+    assert func.bump('train-4998') == 'train-4999'
+    assert func.sort_key('train-2500') == 2500
+
+
+def test_values_duplicate_values_use_first_position():
+    func = ValuesFunction(['a', 'b', 'a', 'c'])
+    assert func.bump('a') == 'b'
@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import unicode_literals
+
+import json
+import os
+
+from bumpversion import main
+from bumpversion.index import INDEX_FILE, OccurrenceIndex, find_offsets
+
+
+def _project(tmpdir):
+    tmpdir.chdir()
+    tmpdir.join('.bumpversion.cfg').write(
+        "[bumpversion]\ncurrent_version = 1.2.3\noccurrence_index = True\n\n"
+        "[bumpversion:file:VERSION]\n\n[bumpversion:file:README]\n")
+    tmpdir.join('VERSION').write("1.2.3\n")
+    tmpdir.join('README').write("Version 1.2.3, not 1.2.30\nSee 1.2.3\n")
+
+
+def _offsets(tmpdir, path):
+    with open(str(tmpdir.join(INDEX_FILE))) as f:
+        return json.load(f)['files'][path]['offsets']
+
+
+def test_find_offsets():
+    assert find_offsets(b"1.2.3 and 1.2.3.4, 1.1.1.1", b"1.2.3") == [0, 10]
+    assert find_offsets(b"aaaa", b"aa") == [0, 2]
+    assert find_offsets(b"abc", b"d") == []
+
+
+def test_written_files_are_indexed(tmpdir):
+    _project(tmpdir)
+    main(['minor'])
+
+    assert tmpdir.join('README').read() == "Version 1.3.0, not 1.3.00\nSee 1.3.0\n"
+    assert _offsets(tmpdir, 'README') == {'1.3.0': [8, 19, 30]}
+    assert _offsets(tmpdir, 'VERSION') == {'1.3.0': [0]}
+
+
+def test_unchanged_files_are_patched_in_place(tmpdir, caplog):
+    _project(tmpdir)
+    main(['minor'])
+    readme_inode = os.stat('README').st_ino
+
+    main(['--verbose', 'minor'])
+
+    assert tmpdir.join('VERSION').read() == "1.4.0\n"
+    assert tmpdir.join('README').read() == "Version 1.4.0, not 1.4.00\nSee 1.4.0\n"
+    # patched, not replaced by a new file
+    assert os.stat('README').st_ino == readme_inode
+    assert "Changing file README in place: '1.3.0' -> '1.4.0' at 3 indexed offsets" in caplog.text
+    assert "Patched 2 indexed files in place" in caplog.text
+    assert _offsets(tmpdir, 'README') == {'1.4.0': [8, 19, 30]}
+
+
+def test_changed_files_are_rescanned(tmpdir):
+    _project(tmpdir)
+    main(['minor'])
+    tmpdir.join('README').write("Moved: 1.3.0\n", mode='a')
+
+    main(['minor'])
+
+    assert tmpdir.join('README').read() == "Version 1.4.0, not 1.4.00\nSee 1.4.0\nMoved: 1.4.0\n"
+    assert _offsets(tmpdir, 'README') == {'1.4.0': [8, 19, 30, 43]}
+
+
+def test_validation_read_catches_stale_offsets(tmpdir):
+    _project(tmpdir)
+    main(['minor'])
+    stat = os.stat('README')
+    # same size and mtime, but the version moved
+    tmpdir.join('README').write("Version 1.3.0, not 1.3.00\n1.3.0 See\n")
+    if hasattr(stat, 'st_mtime_ns'):
+        os.utime('README', ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    else:
+        # Python < 3.3, where the index keeps st_mtime
+        os.utime('README', (stat.st_atime, stat.st_mtime))
+
+    main(['minor'])
+
+    assert tmpdir.join('README').read() == "Version 1.4.0, not 1.4.00\n1.4.0 See\n"
+    assert _offsets(tmpdir, 'README') == {'1.4.0': [8, 19, 26]}
+
+
+def test_touched_files_are_validated_by_hash(tmpdir):
+    _project(tmpdir)
+    main(['minor'])
+    os.utime('README', (0, 0))
+
+    index = OccurrenceIndex()
+    assert index.offsets('README', '1.3.0') == [8, 19, 30]
+    assert index.changed
+
+
+def test_length_changes_rewrite_the_file(tmpdir):
+    _project(tmpdir)
+    tmpdir.join('.bumpversion.cfg').write(
+        tmpdir.join('.bumpversion.cfg').read().replace("1.2.3", "1.9.0"))
+    tmpdir.join('VERSION').write("1.9.0\n")
+    tmpdir.join('README').write("Version 1.9.0\n")
+    main(['patch'])
+
+    main(['minor'])
+
+    assert tmpdir.join('README').read() == "Version 1.10.0\n"
+    assert _offsets(tmpdir, 'README') == {'1.10.0': [8]}
+
+
+def test_no_index_without_the_option(tmpdir):
+    _project(tmpdir)
+    tmpdir.join('.bumpversion.cfg').write(
+        tmpdir.join('.bumpversion.cfg').read().replace("occurrence_index = True\n", ""))
+
+    main(['minor'])
+
+    assert not tmpdir.join(INDEX_FILE).exists()
+
+
+def test_dry_run_leaves_the_index_alone(tmpdir):
+    _project(tmpdir)
+
+    main(['--dry-run', 'minor'])
+
+    assert not tmpdir.join(INDEX_FILE).exists()
@@ -0,0 +1,145 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import unicode_literals
+
+import os
+
+import pytest
+
+import bumpversion.config
+from bumpversion import main
+from bumpversion.config import CONFIG_CACHE_DIRECTORY
+from bumpversion.monorepo import DEFAULT_EXCLUDE, find_projects, read_dependencies, schedule
+
+
+def _project(directory, version):
+    directory.ensure(dir=True)
+    directory.join('.bumpversion.cfg').write(
+        "[bumpversion]\ncurrent_version = {}\n\n[bumpversion:file:VERSION]\n".format(version))
+    directory.join('VERSION').write("{}\n".format(version))
+
+
+def test_find_projects_skips_excluded_directories(tmpdir):
+    _project(tmpdir, '1.0.0')
+    _project(tmpdir.join('libs', 'a'), '0.1.0')
+    _project(tmpdir.join('libs', 'b'), '0.2.0')
+    _project(tmpdir.join('build', 'c'), '0.3.0')
+    _project(tmpdir.join('.git', 'd'), '0.4.0')
+    tmpdir.join('libs', 'a', 'docs').ensure(dir=True)
+
+    projects = list(find_projects(str(tmpdir), DEFAULT_EXCLUDE + ['build']))
+    assert projects == ['.', os.path.join('libs', 'a'), os.path.join('libs', 'b')]
+
+    projects = list(find_projects(str(tmpdir), ['libs/b', '.git']))
+    assert projects == ['.', os.path.join('build', 'c'), os.path.join('libs', 'a')]
+
+
+@pytest.mark.parametrize("scandir", [True, False])
+@pytest.mark.skipif(not hasattr(os, 'symlink'), reason="needs symlinks")
+def test_find_projects_does_not_follow_symlinks(tmpdir, monkeypatch, scandir):
+    _project(tmpdir.join('libs', 'a'), '0.1.0')
+    tmpdir.join('libs', 'link').mksymlinkto(tmpdir.join('libs', 'a'))
+    if not scandir:
+        monkeypatch.delattr(os, 'scandir', raising=False)
+
+    assert list(find_projects(str(tmpdir))) == [os.path.join('libs', 'a')]
+
+
+@pytest.mark.parametrize("processes", ['1', '2'])
+def test_monorepo_bumps_every_project(tmpdir, capsys, processes):
+    _project(tmpdir.join('a'), '0.1.0')
+    _project(tmpdir.join('b'), '1.2.3')
+    tmpdir.chdir()
+
+    main(['--monorepo', '--processes', processes, '--list', 'minor'])
+
+    assert tmpdir.join('a', 'VERSION').read() == "0.2.0\n"
+    assert tmpdir.join('b', 'VERSION').read() == "1.3.0\n"
+    out, err = capsys.readouterr()
+    assert "[a] new_version=0.2.0" in out.splitlines()
+    assert "[b] new_version=1.3.0" in out.splitlines()
+    assert "Bumped 2 of 2 projects" in err
+
+
+def test_monorepo_reports_failed_projects(tmpdir, capsys):
+    _project(tmpdir.join('a'), '0.1.0')
+    _project(tmpdir.join('b'), '1.2.3')
+    tmpdir.join('b', 'VERSION').remove()
+    tmpdir.chdir()
+
+    with pytest.raises(SystemExit) as exc:
+        main(['--monorepo', '--processes', '2', 'patch'])
+
+    assert exc.value.code == 1
+    assert tmpdir.join('a', 'VERSION').read() == "0.1.1\n"
+    out, err = capsys.readouterr()
+    assert "[b] failed with exit status 2" in err
+    assert "Bumped 1 of 2 projects, failed: b" in err
+
+
+def _dependent_project(directory, version, dependency, dependency_version):
+    directory.ensure(dir=True)
+    directory.join('.bumpversion.cfg').write(
+        "[bumpversion]\ncurrent_version = {}\n\n"
+        "[bumpversion:depends:../{}]\nsearch = {}=={{current_version}}\nreplace = {}=={{new_version}}\n".format(
+            version, dependency, dependency, dependency))
+    directory.join('setup.py').write("setup(version='{}', install_requires=['{}=={}'])\n".format(
+        version, dependency, dependency_version))
+
+
+def test_schedule_orders_dependents_after_dependencies():
+    projects = ['app', 'core', 'other', 'util']
+    dependencies = {'app': {'core', 'util'}, 'util': {'core'}}
+
+    assert schedule(projects, dependencies, ['core']) == [['core'], ['util'], ['app']]
+    assert schedule(projects, dependencies, ['util', 'other']) == [['other', 'util'], ['app']]
+    assert schedule(projects, dependencies, projects) == [['core', 'other'], ['util'], ['app']]
+
+    with pytest.raises(ValueError):
+        schedule(projects, {'core': {'app'}, 'app': {'core'}}, ['core'])
+
+
+@pytest.mark.parametrize("processes", ['1', '2'])
+def test_monorepo_bumps_dependents_and_their_pins(tmpdir, capsys, processes):
+    _project(tmpdir.join('core'), '1.0.0')
+    _dependent_project(tmpdir.join('app'), '0.1.0', 'core', '1.0.0')
+    _dependent_project(tmpdir.join('cli'), '2.0.0', 'app', '0.1.0')
+    _project(tmpdir.join('other'), '3.0.0')
+    tmpdir.chdir()
+
+    main(['--monorepo', '--processes', processes, '--only', 'core', 'minor'])
+
+    assert tmpdir.join('core', 'VERSION').read() == "1.1.0\n"
+    assert tmpdir.join('app', 'setup.py').read() == "setup(version='0.1.1', install_requires=['core==1.1.0'])\n"
+    assert 'current_version = 0.1.1' in tmpdir.join('app', '.bumpversion.cfg').read()
+    assert tmpdir.join('cli', 'setup.py').read() == "setup(version='2.0.1', install_requires=['app==0.1.1'])\n"
+    assert tmpdir.join('other', 'VERSION').read() == "3.0.0\n"
+    assert "Bumped 3 of 3 projects" in capsys.readouterr().err
+
+
+def test_monorepo_skips_dependents_of_failed_projects(tmpdir, capsys):
+    _project(tmpdir.join('core'), '1.0.0')
+    tmpdir.join('core', 'VERSION').remove()
+    _dependent_project(tmpdir.join('app'), '0.1.0', 'core', '1.0.0')
+    tmpdir.chdir()
+
+    with pytest.raises(SystemExit) as exc:
+        main(['--monorepo', 'patch'])
+
+    assert exc.value.code == 1
+    assert tmpdir.join('app', 'setup.py').read() == "setup(version='0.1.0', install_requires=['core==1.0.0'])\n"
+    assert "[app] skipped, depends on failed core" in capsys.readouterr().err
+
+
+def test_read_dependencies_caches_configs_in_their_projects(tmpdir):
+    _project(tmpdir.join('core'), '1.0.0')
+    _dependent_project(tmpdir.join('app'), '0.1.0', 'core', '1.0.0')
+    config = tmpdir.join('app', '.bumpversion.cfg')
+    config.write(config.read().replace("[bumpversion]\n", "[bumpversion]\nconfig_cache = True\n"))
+    bumpversion.config._resolved_configs.clear()
+    tmpdir.chdir()
+
+    assert read_dependencies(str(tmpdir), ['app', 'core']) == {'app': {'core'}, 'core': set()}
+
+    assert not tmpdir.join(CONFIG_CACHE_DIRECTORY).exists()
+    assert len(tmpdir.join('app', CONFIG_CACHE_DIRECTORY).listdir()) == 1
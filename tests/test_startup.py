@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import unicode_literals
+
+import os
+import subprocess
+import sys
+
+import pytest
+
+# modules only some code paths need, which `import bumpversion` must not load
+LAZY_MODULES = ['argparse', 'configparser', 'difflib', 'hashlib', 'json', 'multiprocessing', 'shutil',
+                'subprocess', 'tempfile']
+
+# the bumpversion modules `import bumpversion` loads
+CORE_MODULES = ['bumpversion', 'bumpversion.config', 'bumpversion.context', 'bumpversion.functions',
+                'bumpversion.version_part']
+
+
+def _python(code):
+    # a fresh interpreter, with nothing imported yet
+    return subprocess.check_output(
+        [sys.executable, '-c', code],
+        stderr=subprocess.STDOUT,
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    ).decode('utf-8')
+
+
+@pytest.mark.skipif(sys.version_info < (3, 7), reason="older Pythons import these eagerly")
+def test_import_does_not_load_lazy_modules():
+    loaded = _python(
+        "import sys, bumpversion; print(' '.join(m for m in {!r} if m in sys.modules))".format(LAZY_MODULES))
+    assert loaded.split() == []
+
+
+def test_import_loads_only_the_core_modules():
+    loaded = _python("import sys, bumpversion; print(' '.join(sorted(sys.modules)))")
+    assert [m for m in loaded.split() if m.startswith('bumpversion')] == CORE_MODULES
+
+
+def test_bump_without_commit_does_not_load_git(tmpdir):
+    project = tmpdir.join('project')
+    project.ensure(dir=True)
+    project.join('.bumpversion.cfg').write("[bumpversion]\ncurrent_version = 1.2.3\n")
+    project.join('VERSION').write("1.2.3\n")
+
+    loaded = _python(
+        "import os, sys, bumpversion; os.chdir({!r}); bumpversion.main(['patch']); "
+        "print(' '.join(m for m in ['subprocess', 'bumpversion.vcs'] if m in sys.modules))".format(str(project)))
+    assert loaded.split() == []
+    assert project.join('VERSION').read() == "1.2.4\n"
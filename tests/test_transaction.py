@@ -0,0 +1,155 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import unicode_literals
+
+import pytest
+
+import bumpversion.config
+from bumpversion import ContentCache, main
+from bumpversion.config import CONFIG_CACHE_DIRECTORY
+from bumpversion.transaction import JOURNAL_DIRECTORY, Transaction, recover
+
+
+def _project(tmpdir):
+    tmpdir.chdir()
+    tmpdir.join('.bumpversion.cfg').write(
+        "[bumpversion]\ncurrent_version = 1.2.3\n\n[bumpversion:file:VERSION]\n\n[bumpversion:file:README]\n")
+    tmpdir.join('VERSION').write("1.2.3\n")
+    tmpdir.join('README').write("Version 1.2.3\n")
+
+
+def test_transaction_writes_every_file(tmpdir):
+    _project(tmpdir)
+    transaction = Transaction(ContentCache().write)
+    transaction.add('VERSION', "1.2.3\n", "1.2.4\n")
+    transaction.add('README', "Version 1.2.3\n", "Version 1.2.4\n")
+    transaction.commit()
+
+    assert tmpdir.join('VERSION').read() == "1.2.4\n"
+    assert tmpdir.join('README').read() == "Version 1.2.4\n"
+    assert not tmpdir.join(JOURNAL_DIRECTORY).exists()
+
+
+def test_transaction_rolls_back_on_failure(tmpdir):
+    _project(tmpdir)
+    cache = ContentCache()
+
+    def write(path, content):
+        if path == 'README':
+            raise IOError("disk full")
+        cache.write(path, content)
+
+    transaction = Transaction(write)
+    transaction.add('VERSION', "1.2.3\n", "1.2.4\n")
+    transaction.add('README', "Version 1.2.3\n", "Version 1.2.4\n")
+    with pytest.raises(IOError):
+        transaction.commit()
+
+    assert tmpdir.join('VERSION').read() == "1.2.3\n"
+    assert tmpdir.join('README').read() == "Version 1.2.3\n"
+    assert not tmpdir.join(JOURNAL_DIRECTORY).exists()
+
+
+def test_interrupted_bump_is_rolled_back_by_the_next_run(tmpdir):
+    _project(tmpdir)
+    transaction = Transaction(ContentCache().write)
+    transaction.add('VERSION', "1.2.3\n", "1.2.4\n")
+    transaction.add('README', "Version 1.2.3\n", "Version 1.2.4\n")
+    # killed after writing the first file
+    transaction._write_journal()
+    tmpdir.join('VERSION').write("1.2.4\n")
+
+    main(['--transactional', 'minor'])
+
+    assert tmpdir.join('VERSION').read() == "1.3.0\n"
+    assert tmpdir.join('README').read() == "Version 1.3.0\n"
+    assert 'current_version = 1.3.0' in tmpdir.join('.bumpversion.cfg').read()
+    assert not tmpdir.join(JOURNAL_DIRECTORY).exists()
+
+
+def test_recover_leaves_files_changed_since(tmpdir):
+    _project(tmpdir)
+    transaction = Transaction(ContentCache().write)
+    transaction.add('VERSION', "1.2.3\n", "1.2.4\n")
+    transaction.add('README', "Version 1.2.3\n", "Version 1.2.4\n")
+    transaction._write_journal()
+    tmpdir.join('VERSION').write("1.2.4\n")
+    tmpdir.join('README').write("edited by hand\n")
+
+    assert recover() == ['VERSION']
+    assert tmpdir.join('VERSION').read() == "1.2.3\n"
+    assert tmpdir.join('README').read() == "edited by hand\n"
+
+
+def test_dry_run_does_not_roll_back(tmpdir, caplog):
+    _project(tmpdir)
+    transaction = Transaction(ContentCache().write)
+    transaction.add('VERSION', "1.2.3\n", "1.2.4\n")
+    transaction._write_journal()
+    tmpdir.join('VERSION').write("1.2.4\n")
+
+    main(['--dry-run', 'minor'])
+
+    assert tmpdir.join('VERSION').read() == "1.2.4\n"
+    assert tmpdir.join(JOURNAL_DIRECTORY).exists()
+    assert "Found the journal of an interrupted bump" in caplog.text
+
+
+@pytest.mark.parametrize("args,config", [
+    (['--dry', 'minor'], ""),
+    (['minor'], "dry_run = True\n"),
+])
+def test_any_dry_run_does_not_roll_back(tmpdir, args, config):
+    _project(tmpdir)
+    tmpdir.join('.bumpversion.cfg').write(
+        tmpdir.join('.bumpversion.cfg').read().replace("[bumpversion]\n", "[bumpversion]\n" + config))
+    transaction = Transaction(ContentCache().write)
+    transaction.add('VERSION', "1.2.3\n", "1.2.4\n")
+    transaction._write_journal()
+    tmpdir.join('VERSION').write("1.2.4\n")
+
+    main(args)
+
+    assert tmpdir.join('VERSION').read() == "1.2.4\n"
+    assert tmpdir.join(JOURNAL_DIRECTORY).exists()
+
+
+def test_config_restored_by_the_rollback_is_read_again(tmpdir):
+    _project(tmpdir)
+    config = tmpdir.join('.bumpversion.cfg')
+    transaction = Transaction(ContentCache().write)
+    transaction.add('VERSION', "1.2.3\n", "1.3.0\n")
+    transaction.add('.bumpversion.cfg', config.read(), config.read().replace("1.2.3", "1.3.0"))
+    # killed after writing every file, before committing
+    transaction._write_journal()
+    tmpdir.join('VERSION').write("1.3.0\n")
+    config.write(config.read().replace("1.2.3", "1.3.0"))
+
+    main(['minor'])
+
+    assert tmpdir.join('VERSION').read() == "1.3.0\n"
+    assert tmpdir.join('README').read() == "Version 1.3.0\n"
+    assert 'current_version = 1.3.0' in config.read()
+    assert not tmpdir.join(JOURNAL_DIRECTORY).exists()
+
+
+def test_rolled_back_bump_does_not_cache_the_new_config(tmpdir, monkeypatch):
+    _project(tmpdir)
+    config = tmpdir.join('.bumpversion.cfg')
+    config.write(config.read().replace("[bumpversion]\n", "[bumpversion]\nconfig_cache = True\n"))
+    bumpversion.config._resolved_configs.clear()
+    write = ContentCache.write
+
+    def failing_write(self, path, content):
+        if path == '.bumpversion.cfg':
+            raise IOError("disk full")
+        return write(self, path, content)
+
+    monkeypatch.setattr(ContentCache, 'write', failing_write)
+    with pytest.raises(IOError):
+        main(['--transactional', 'minor'])
+
+    assert 'current_version = 1.2.3' in config.read()
+    assert tmpdir.join(CONFIG_CACHE_DIRECTORY).listdir() == [
+        tmpdir.join(bumpversion.config._cache_path(config.read(), CONFIG_CACHE_DIRECTORY))]
+    assert list(bumpversion.config._resolved_configs) == [config.read()]
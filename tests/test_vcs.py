@@ -0,0 +1,199 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import unicode_literals
+
+import subprocess
+
+import pytest
+
+from bumpversion import WorkingDirectoryIsDirtyException, main
+from bumpversion.vcs import GitStatus
+
+
+def _has_git():
+    try:
+        return subprocess.call(['git', '--version'], stdout=subprocess.PIPE) == 0
+    except OSError:
+        return False
+
+
+needs_git = pytest.mark.skipif(not _has_git(), reason="git is not installed")
+
+
+def _git(*args):
+    return subprocess.check_output(('git',) + args).decode('utf-8')
+
+
+@pytest.fixture
+def repository(tmpdir, monkeypatch):
+    for variable in ('AUTHOR', 'COMMITTER'):
+        monkeypatch.setenv('GIT_{}_NAME'.format(variable), 'Test')
+        monkeypatch.setenv('GIT_{}_EMAIL'.format(variable), 'test@example.com')
+    tmpdir.chdir()
+    _git('init', '-q')
+    tmpdir.join('.bumpversion.cfg').write(
+        "[bumpversion]\ncurrent_version = 1.2.3\ncommit = True\ntag = True\n\n[bumpversion:file:README]\n")
+    tmpdir.join('VERSION').write("1.2.3\n")
+    tmpdir.join('README').write("Version 1.2.3\n")
+    tmpdir.join('NOTES').write("notes\n")
+    _git('add', '.')
+    _git('commit', '-q', '-m', 'initial commit')
+    _git('tag', 'v1.2.3')
+    return tmpdir
+
+
+def test_parse_status():
+    status = GitStatus.parse(" M README\0R  NEW\0OLD\0?? VERSION\0!! build/x\0", '/repo')
+    assert status.dirty == ['/repo/README', '/repo/NEW']
+    assert status.untracked == ['/repo/VERSION', '/repo/build/x']
+
+
+@needs_git
+def test_commit_and_tag(repository, caplog):
+    main(['--verbose', 'minor'])
+
+    assert _git('log', '-1', '--format=%s') == "Bump version: 1.2.3 → 1.3.0\n"
+    assert _git('tag', '--points-at', 'HEAD') == "v1.3.0\n"
+    assert _git('status', '--porcelain') == ""
+    assert "Spawned 3 git processes" in caplog.text
+
+
+@needs_git
+def test_commit_without_tag(repository, caplog):
+    main(['--verbose', '--no-tag', '--message', 'Release {new_version}', 'minor'])
+
+    assert _git('log', '-1', '--format=%s') == "Release 1.3.0\n"
+    assert _git('tag', '--points-at', 'HEAD') == ""
+    assert "Spawned 2 git processes" in caplog.text
+
+
+@needs_git
+def test_dirty_bumped_file_aborts(repository, caplog):
+    repository.join('README').write("Version 1.2.3\nmore\n")
+
+    with pytest.raises(WorkingDirectoryIsDirtyException):
+        main(['minor'])
+
+    assert "Git working directory is not clean:\nREADME" in caplog.text
+    assert repository.join('VERSION').read() == "1.2.3\n"
+    assert _git('log', '-1', '--format=%s') == "initial commit\n"
+
+
+@needs_git
+def test_dirty_check_is_scoped_to_the_bumped_files(repository):
+    repository.join('NOTES').write("changed\n")
+
+    main(['minor'])
+
+    # committed without the unrelated change
+    assert _git('status', '--porcelain') == " M NOTES\n"
+
+
+@needs_git
+def test_staged_changes_to_other_files_are_not_committed(repository):
+    repository.join('other').write("y\n")
+    _git('add', 'other')
+
+    main(['minor'])
+
+    assert _git('show', '--name-only', '--format=', 'HEAD') == ".bumpversion.cfg\nREADME\nVERSION\n"
+    assert _git('status', '--porcelain') == "A  other\n"
+
+
+@needs_git
+def test_allow_dirty(repository):
+    repository.join('README').write("Version 1.2.3\nmore\n")
+
+    main(['--allow-dirty', 'minor'])
+
+    assert _git('show', 'HEAD:README') == "Version 1.3.0\nmore\n"
+
+
+@needs_git
+def test_untracked_files_are_not_committed(repository):
+    _git('rm', '-q', '--cached', 'README')
+    _git('commit', '-q', '-m', 'untrack README')
+
+    main(['minor'])
+
+    assert repository.join('README').read() == "Version 1.3.0\n"
+    assert _git('status', '--porcelain') == "?? README\n"
+    assert _git('show', 'HEAD:VERSION') == "1.3.0\n"
+
+
+@needs_git
+def test_no_commit_without_tracked_files(repository, caplog):
+    repository.join('other').write("y\n")
+    _git('add', 'other')
+    _git('rm', '-q', '--cached', 'README', 'VERSION', '.bumpversion.cfg')
+    _git('commit', '-q', '-m', 'untrack everything')
+
+    main(['minor'])
+
+    assert repository.join('VERSION').read() == "1.3.0\n"
+    assert "Not committing to Git, it doesn't track any of the bumped files" in caplog.text
+    assert _git('log', '-1', '--format=%s') == "untrack everything\n"
+    assert _git('tag', '--points-at', 'HEAD') == ""
+
+
+@needs_git
+def test_failing_commit_exits_with_gits_message(repository, caplog):
+    _git('tag', 'v1.3.0')
+
+    with pytest.raises(SystemExit) as e:
+        main(['minor'])
+
+    assert e.value.code == 2
+    assert "Unable to commit, git failed: fatal: tag 'v1.3.0' already exists" in caplog.text
+
+
+@needs_git
+def test_commit_from_a_subdirectory(repository):
+    project = repository.join('libs', 'a')
+    project.ensure(dir=True)
+    project.join('.bumpversion.cfg').write("[bumpversion]\ncurrent_version = 0.1.0\ncommit = True\n")
+    project.join('VERSION').write("0.1.0\n")
+    project.join('build.log').write("0.1.0\n")
+    repository.join('.gitignore').write("*.log\n")
+    _git('add', '.')
+    _git('commit', '-q', '-m', 'add libs/a')
+    project.chdir()
+
+    main(['--verbose', 'patch', 'build.log'])
+
+    assert _git('show', 'HEAD:libs/a/VERSION') == "0.1.1\n"
+    assert project.join('build.log').read() == "0.1.1\n"
+
+
+@needs_git
+def test_dry_run_only_checks(repository, caplog):
+    main(['--verbose', '--dry-run', 'minor'])
+
+    assert "Would commit to Git with message 'Bump version: 1.2.3 → 1.3.0'" in caplog.text
+    assert "Would tag 'v1.3.0' in Git" in caplog.text
+    assert "Spawned 1 git processes" in caplog.text
+    assert _git('log', '-1', '--format=%s') == "initial commit\n"
+
+
+@needs_git
+def test_vcs_info_in_templates(repository):
+    repository.join('NOTES').write("more notes\n")
+    _git('commit', '-q', '-am', 'notes')
+    commit_sha = _git('rev-parse', 'HEAD').strip()
+
+    main(['--message', '{new_version}, {distance_to_latest_tag} after the tag, from {commit_sha}', 'minor'])
+
+    assert _git('log', '-1', '--format=%s') == "1.3.0, 1 after the tag, from {}\n".format(commit_sha)
+
+
+def test_commit_outside_a_repository(tmpdir, monkeypatch):
+    monkeypatch.setenv('GIT_CEILING_DIRECTORIES', str(tmpdir.dirpath()))
+    tmpdir.chdir()
+    tmpdir.join('.bumpversion.cfg').write("[bumpversion]\ncurrent_version = 1.2.3\ncommit = True\n")
+    tmpdir.join('VERSION').write("1.2.3\n")
+
+    with pytest.raises(SystemExit) as e:
+        main(['minor'])
+
+    assert e.value.code == 2
+    assert tmpdir.join('VERSION').read() == "1.2.3\n"
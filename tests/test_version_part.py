@@ -1,5 +1,8 @@
+import logging
+
 import pytest
 
+import bumpversion
 from bumpversion.version_part import *
 
 
@@ -52,3 +55,161 @@ def test_version_part_equality(confvpc):
 def test_version_part_null(confvpc):
     assert VersionPart(confvpc.first_value, confvpc).null() == VersionPart(
         confvpc.first_value, confvpc)
+
+
+def test_version_part_copy_keeps_config(confvpc):
+    vp = VersionPart(confvpc.first_value, confvpc)
+    assert vp.copy().config is confvpc
+
+
+def test_version_part_hash(confvpc):
+    assert hash(VersionPart(confvpc.first_value, confvpc)) == hash(
+        VersionPart(confvpc.first_value, confvpc))
+
+
+def test_version_part_has_no_dict(confvpc):
+    assert not hasattr(VersionPart(confvpc.first_value, confvpc), '__dict__')
+
+
+def test_version_parts_share_default_config():
+    assert VersionPart('1').config is VersionPart('2').config
+
+
+# Version and VersionConfig
+
+
+def test_serialize_format_is_parsed_once():
+    serialize_format = bumpversion.SerializeFormat('v{major}.{minor}-{release}')
+    assert serialize_format.literals == ('v', '.', '-')
+    assert serialize_format.labels == ('major', 'minor', 'release')
+    assert serialize_format.required == frozenset(['major', 'minor', 'release'])
+
+
+@pytest.mark.parametrize("version_string", ['1.2.3', '1.2.3-dev'])
+def test_serialize_chooses_most_specific_format(version_string, release_version_config):
+    vc = release_version_config
+    assert vc.order() == ('major', 'minor', 'patch', 'release')
+    assert vc.serialize(vc.parse(version_string), {}) == version_string
+
+
+@pytest.mark.parametrize("version_string", ['1.2.3', '1.2.0', '1.0.0', '0.0.0-dev', '1.2.3-dev', '1.2.0-gamma'])
+def test_memoized_serialize_format_matches_trial_serialization(version_string, release_version_config):
+    vc = release_version_config
+    version = vc.parse(version_string)
+    assert vc._choose_serialize_format(version, {}) is vc._try_serialize_formats(version, {})
+    assert vc._choose_serialize_format(version, {}) is vc._try_serialize_formats(version, {})
+
+
+def test_serialize_format_cache_is_keyed_by_shape_and_invalidated(release_version_config):
+    vc = release_version_config
+    for version_string in ['1.2.3', '4.5.6', '1.2.3-dev', '7.8.9-dev']:
+        vc.serialize(vc.parse(version_string), {})
+    assert len(vc._format_cache) == 2
+
+    vc.part_configs = {}
+    assert len(vc._format_cache) == 0
+
+
+def test_serialize_reports_missing_values():
+    vc = bumpversion.VersionConfig(
+        parse=r'(?P<major>\d+)\.(?P<minor>\d+)\.(?P<patch>\d+)',
+        serialize=['{major}.{minor}.{patch}-{$BUILD}'],
+        search='{current_version}',
+        replace='{new_version}',
+    )
+    with pytest.raises(bumpversion.MissingValueForSerializationException):
+        vc.serialize(vc.parse('1.2.3'), {})
+    assert vc.serialize(vc.parse('1.2.3'), {'$BUILD': '42'}) == '1.2.3-42'
+
+
+def test_bulk_parse_bump_serialize(release_version_config):
+    vc = release_version_config
+    versions = list(vc.parse_many(['1.2.3', 'garbage', '1.2.3-dev']))
+    assert versions[1] is None
+
+    bumped = vc.bump_many(versions, 'patch')
+    assert list(vc.serialize_many(bumped)) == ['1.2.4-dev', None, '1.2.4-dev']
+
+
+def test_bulk_parse_shares_a_bounded_number_of_parts(monkeypatch, release_version_config):
+    monkeypatch.setattr(bumpversion, 'PARSE_MANY_SHARED_PARTS', 2)
+    vc = release_version_config
+    versions = list(vc.parse_many(['1.0.1', '1.0.1', '1.0.2', '1.0.3', '1.0.1']))
+
+    assert versions[0]['patch'] is versions[1]['patch']
+    assert versions[0]['major'] is versions[4]['major']
+    # dropped when 1.0.3 came along
+    assert versions[0]['patch'] is not versions[4]['patch']
+    assert [str(v['patch'].value) for v in versions] == ['1', '1', '2', '3', '1']
+
+
+def test_bulk_to_array(release_version_config):
+    numpy = pytest.importorskip('numpy')
+    vc = release_version_config
+    array = vc.to_array(vc.parse_many(['1.2.3', 'garbage', '10.0.1-dev']))
+    assert array.dtype.names == ('parsed', 'major', 'minor', 'patch')
+    assert array['parsed'].tolist() == [True, False, True]
+    assert array['major'].tolist() == [1, 0, 10]
+    assert numpy.issubdtype(array['patch'].dtype, numpy.integer)
+
+
+def test_version_is_compact_hashable_and_immutable(release_version_config):
+    vc = release_version_config
+    version = vc.parse('1.2.3-dev')
+    same_version = vc.parse('1.2.3-dev')
+
+    assert list(version) == ['major', 'minor', 'patch', 'release']
+    assert version['patch'].value == '3'
+    assert version == same_version
+    assert len(set([version, same_version, vc.parse('1.2.4-dev')])) == 2
+    assert version._labels is same_version._labels
+    assert not hasattr(version, '__dict__')
+    with pytest.raises(AttributeError):
+        version.original = '4.5.6'
+
+
+def test_version_bump_keeps_part_configs(release_version_config):
+    vc = release_version_config
+    bumped = vc.parse('1.2.3-dev').bump('patch', vc.order())
+    assert bumped['release'].config is vc.part_configs['release']
+    assert vc.serialize(bumped.bump('release', vc.order()), {}) == '1.2.4'
+
+
+def test_versions_are_ordered_by_parts(release_version_config):
+    vc = release_version_config
+    versions = list(vc.parse_many(['1.10.0', '1.9.0-dev', '1.9.0', '1.9.0-gamma', '0.1.0-dev']))
+
+    assert [vc.serialize(v, {}) for v in sorted(versions)] == \
+        ['0.1.0-dev', '1.9.0-dev', '1.9', '1.9', '1.10']
+    assert sorted(versions) == sorted(versions, key=lambda v: v.sort_key)
+    assert max(versions) == versions[0]
+    assert versions[1] < versions[2] <= versions[3] < versions[0]
+    assert versions[2].sort_key == (1, 9, 0, 1)
+
+
+def test_parse_does_not_format_log_messages_when_not_logged(monkeypatch, caplog, release_version_config):
+    vc = release_version_config
+    caplog.set_level(logging.WARNING, logger=bumpversion.logger.name)
+
+    def fail(d):
+        raise AssertionError("log message should not be formatted")
+
+    monkeypatch.setattr(bumpversion, 'keyvaluestring', fail)
+    assert vc.parse('1.2.3-dev')['release'].value == 'dev'
+
+
+def test_version_configs_share_compiled_regex_and_formats():
+    parse = r'(?P<major>\d+)\.(?P<minor>\d+)\.(?P<patch>\d+)-shared'
+    misses = bumpversion.compiled_version_configs.misses
+    hits = bumpversion.compiled_version_configs.hits
+
+    first = bumpversion.VersionConfig(parse=parse, serialize=['{major}.{minor}.{patch}'],
+                                      search='{current_version}', replace='{new_version}')
+    second = bumpversion.VersionConfig(parse=parse, serialize=['{major}.{minor}.{patch}'],
+                                       search='version={current_version}', replace='version={new_version}')
+
+    assert bumpversion.compiled_version_configs.misses - misses == 1
+    assert bumpversion.compiled_version_configs.hits - hits == 1
+    assert first.parse_regex is second.parse_regex
+    assert first._compiled_formats is second._compiled_formats
+    assert first._format_cache is not second._format_cache